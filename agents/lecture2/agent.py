@@ -1,11 +1,27 @@
+import multiprocessing
+import os
+import time
+import warnings
+from multiprocessing import shared_memory
+
 import numpy as np
 
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import MatrixRankWarning, spsolve
+except ImportError:
+    # without scipy policies are evaluated iteratively
+    sparse = None
+
+from mdp import CompiledMDP
+
 
 class ValueIteration():
     def __init__(self, states_n, actions_n, P, gamma):
         self.states_n = states_n
         self.actions_n = actions_n
         self.P = P
+        self.mdp = CompiledMDP.from_P(P, states_n, actions_n)
         self.gamma = gamma
         self.reset()
 
@@ -19,23 +35,47 @@ class ValueIteration():
     def render(self):
         print("Values: {}, Policy: {}".format(self.values, self.policy))
 
-    def solve(self, iterations):
-        for _ in range(iterations):
-            for s in range(self.states_n):
-                values = [sum([prob * (r + self.gamma * self.values[s_])
-                               for prob, s_, r, _ in self.P[s][a]])
-                          for a in range(self.actions_n)]
-                self.values[s] = max(values)
-                self.policy[s] = np.argmax(np.array(values))
+    def solve(self, iterations=None, tolerance=1e-8, norm="sup"):
+        # Synchronous sweeps until the change between two sweeps, measured with
+        # the sup-norm ("sup") or the span seminorm ("span"), drops below
+        # tolerance, or until iterations sweeps have run.
+        if iterations is None and tolerance is None:
+            raise ValueError("Either iterations or tolerance must be given")
+        start = time.perf_counter()
+        residuals = []
+        while iterations is None or len(residuals) < iterations:
+            new_values = self.mdp.q_values(self.values, self.gamma).max(axis=1)
+            delta = new_values - self.values
+            self.values = new_values
+            if norm == "sup":
+                residuals.append(np.max(np.abs(delta)))
+            elif norm == "span":
+                residuals.append(np.max(delta) - np.min(delta))
+            else:
+                raise ValueError("Unknown norm: {}".format(norm))
+            if tolerance is not None and residuals[-1] < tolerance:
+                break
+        self.policy = self.mdp.q_values(self.values, self.gamma).argmax(axis=1)
+        return {
+            "iterations": len(residuals),
+            "residuals": np.array(residuals),
+            "time": time.perf_counter() - start,
+        }
 
 
 class PolicyIteration():
-    def __init__(self, states_n, actions_n, P, gamma=1, epsilon=1e-10):
+    def __init__(self, states_n, actions_n, P, gamma=1, epsilon=1e-10, evaluation="linear", max_sweeps=100000):
         self.states_n = states_n
         self.actions_n = actions_n
         self.P = P
+        self.mdp = CompiledMDP.from_P(P, states_n, actions_n)
         self.gamma = gamma
         self.epsilon = epsilon
+        # "linear" solves (I - gamma * P_pi) V = R_pi, "iterative" sweeps until convergence
+        self.evaluation = evaluation
+        # cap of the iterative evaluation, it never converges when a policy keeps
+        # collecting reward forever with gamma = 1
+        self.max_sweeps = max_sweeps
         self.reset()
 
     def reset(self):
@@ -52,22 +92,172 @@ class PolicyIteration():
         return sum([prob * (reward + self.gamma * self.values[new_state])
                         for prob, new_state, reward, _ in self.P[state][action]])
 
+    def evaluate_linear(self, policy_mdp):
+        P_pi = sparse.csr_matrix(
+            (policy_mdp.probabilities, (policy_mdp.pairs, policy_mdp.next_states)),
+            shape=(self.states_n, self.states_n),
+        )
+        A = sparse.identity(self.states_n, format="csr") - self.gamma * P_pi
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", MatrixRankWarning)
+            values = spsolve(A.tocsc(), policy_mdp.expected_rewards[:, 0])
+        # singular systems (e.g. gamma = 1 with absorbing states) have no unique solution
+        return values if np.all(np.isfinite(values)) else None
+
+    def evaluate_iterative(self, policy_mdp):
+        values = self.values
+        for _ in range(self.max_sweeps):
+            new_values = policy_mdp.q_values(values, self.gamma)[:, 0]
+            if not np.all(np.isfinite(new_values)):
+                break
+            # check for convergence
+            if np.max(np.abs(values - new_values)) < self.epsilon:
+                return values
+            values = new_values
+        raise RuntimeError(
+            "Policy evaluation did not converge in {} sweeps with gamma = {}, the policy "
+            "keeps collecting reward forever. Use gamma < 1 or a model whose terminal "
+            "states stop paying.".format(self.max_sweeps, self.gamma)
+        )
+
     def solve(self):
-        # iterative algorithm of policy evaluation
         while True:
-            # policy evaluation loop
-            while True:
-                new_values = [ self.Q(state, self.policy[state]) for state in range(self.states_n) ]
-                # check for convergence
-                if max(abs(self.values[state] - new_values[state]) for state in range(self.states_n)) < self.epsilon:
-                    break
-                self.values = new_values
-            # policy improvement
-            policy_stable = True
-            for state in range(self.states_n):
-                old_action = self.policy[state]
-                self.policy[state] = np.argmax([ self.Q(state, action) for action in range(self.actions_n) ])
-                if old_action != self.policy[state]:
-                    policy_stable = False
-            if policy_stable:
+            # policy evaluation
+            policy_mdp = self.mdp.restrict(self.policy)
+            values = None
+            if self.evaluation == "linear" and sparse is not None:
+                values = self.evaluate_linear(policy_mdp)
+            if values is None:
+                values = self.evaluate_iterative(policy_mdp)
+            self.values = values
+            # policy improvement, an action only changes when it is strictly better
+            # so ties cannot make the policy oscillate
+            q = self.mdp.q_values(self.values, self.gamma)
+            states = np.arange(self.states_n)
+            old_policy = self.policy.astype(int)
+            best_policy = q.argmax(axis=1)
+            improved = q[states, best_policy] > q[states, old_policy] + self.epsilon
+            self.policy = np.where(improved, best_policy, old_policy)
+            if not improved.any():
                 break
+
+# Arrays shared with the value iteration worker processes, attached once per worker
+_shared = {}
+
+
+def _attach_shared(specs):
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _shared[name] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+
+def _sweep_block(args):
+    begin, end, source, gamma = args
+    offsets = _shared["offsets"][1]
+    actions_n = _shared["expected_rewards"][1].shape[1]
+    values = _shared["values"][1]
+    first, last = offsets[begin * actions_n], offsets[end * actions_n]
+
+    # entries of a block are contiguous, their (s, a) owners are computed once per worker
+    key = ("pairs", begin, end)
+    if key not in _shared:
+        _shared[key] = np.repeat(
+            np.arange((end - begin) * actions_n, dtype=np.int64),
+            np.diff(offsets[begin * actions_n:end * actions_n + 1]),
+        )
+    future = np.bincount(
+        _shared[key],
+        weights=_shared["probabilities"][1][first:last]
+        * values[source][_shared["next_states"][1][first:last]],
+        minlength=(end - begin) * actions_n,
+    ).reshape(end - begin, actions_n)
+    new_values = (_shared["expected_rewards"][1][begin:end] + gamma * future).max(axis=1)
+    delta = new_values - values[source][begin:end]
+    values[1 - source][begin:end] = new_values
+    return delta.max(), delta.min()
+
+
+class ParallelValueIteration(ValueIteration):
+    def __init__(self, states_n, actions_n, P, gamma, workers=None):
+        super().__init__(states_n, actions_n, P, gamma)
+        self.workers = workers or os.cpu_count()
+
+    def solve(self, iterations=None, tolerance=1e-8, norm="sup"):
+        # Same stopping rules as ValueIteration.solve, but every sweep is split in
+        # blocks of states updated by a pool of processes. The compiled model and
+        # a double buffered value vector live in shared memory.
+        if iterations is None and tolerance is None:
+            raise ValueError("Either iterations or tolerance must be given")
+        if norm not in ("sup", "span"):
+            raise ValueError("Unknown norm: {}".format(norm))
+        start = time.perf_counter()
+
+        arrays = {
+            "offsets": self.mdp.offsets,
+            "probabilities": self.mdp.probabilities,
+            "next_states": self.mdp.next_states,
+            "expected_rewards": self.mdp.expected_rewards,
+            "values": np.stack([self.values, self.values]),
+        }
+        memory, specs = [], {}
+        try:
+            for name, array in arrays.items():
+                shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                memory.append(shm)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+                specs[name] = (shm.name, array.shape, array.dtype)
+            values = np.ndarray(arrays["values"].shape, dtype=np.float64, buffer=memory[-1].buf)
+
+            bounds = np.linspace(0, self.states_n, self.workers + 1).astype(int)
+            blocks = [(b, e) for b, e in zip(bounds[:-1], bounds[1:]) if b < e]
+
+            residuals = []
+            source = 0
+            with multiprocessing.Pool(self.workers, _attach_shared, (specs,)) as pool:
+                sweeps_start = time.perf_counter()
+                while iterations is None or len(residuals) < iterations:
+                    deltas = pool.map(
+                        _sweep_block, [(b, e, source, self.gamma) for b, e in blocks]
+                    )
+                    source = 1 - source
+                    high = max(d[0] for d in deltas)
+                    low = min(d[1] for d in deltas)
+                    residuals.append(max(high, -low) if norm == "sup" else high - low)
+                    if tolerance is not None and residuals[-1] < tolerance:
+                        break
+                sweeps_time = time.perf_counter() - sweeps_start
+            self.values = values[source].copy()
+            del values
+        finally:
+            for shm in memory:
+                shm.close()
+                shm.unlink()
+
+        self.policy = self.mdp.q_values(self.values, self.gamma).argmax(axis=1)
+        return {
+            "iterations": len(residuals),
+            "residuals": np.array(residuals),
+            "time": time.perf_counter() - start,
+            # creating the pool and filling the shared memory, then the sweeps alone
+            "startup": sweeps_start - start,
+            "sweeps_time": sweeps_time,
+            "workers": self.workers,
+        }
+
+    def speedup(self, iterations=100):
+        # Wall time of a fixed number of sweeps against the single process solver.
+        # Both run on solvers of their own, the values and policy of this one are
+        # left as they are. Starting the pool is reported apart, it is paid once.
+        serial = ValueIteration(self.states_n, self.actions_n, self.mdp, self.gamma)
+        serial_time = serial.solve(iterations, tolerance=None)["time"]
+        parallel = ParallelValueIteration(
+            self.states_n, self.actions_n, self.mdp, self.gamma, self.workers
+        )
+        result = parallel.solve(iterations, tolerance=None)
+        return {
+            "serial": serial_time,
+            "parallel": result["sweeps_time"],
+            "startup": result["startup"],
+            "workers": self.workers,
+            "speedup": serial_time / result["sweeps_time"],
+        }
\ No newline at end of file
@@ -14,7 +14,7 @@ env = gym.make('FrozenLake-v2', render_mode="human")
 # agent = PolicyIteration(env.observation_space.n, env.action_space.n, env.P, 0.8)
 agent = ValueIteration(env.observation_space.n, env.action_space.n, env.P, 0.8)
 
-agent.solve(100) # value iteration
+agent.solve(tolerance=1e-6) # value iteration
 # agent.solve() # policy iteration
 
 agent.render()
@@ -0,0 +1,82 @@
+"""
+Import time of the environment modules.
+
+Every module is imported in a fresh interpreter from its own directory, the
+way the lecture scripts run, after numpy, gym and pygame so their own cost is
+reported apart. Next to it is the time to load the textures, frames and fonts
+of its settings module, which importing used to pay for (sounds are left out,
+decoding them needs an audio device).
+
+    python benchmarks/import_time.py [repeats]
+"""
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+# (directory, environment module, settings module, asset registries)
+ENVIRONMENTS = [
+    ("environments/lecture2", "robot_battery", "settings", ["TEXTURES", "FONTS"]),
+    ("environments/lecture3", "frozen_lake", "settings", ["TEXTURES"]),
+    ("environments/lecture4", "princess", "game.settings", ["GAME_TEXTURES", "GAME_FRAMES"]),
+    ("project-v0", "farm", "game.settings", ["GAME_TEXTURES", "GAME_FRAMES"]),
+]
+
+PROBE = """
+import time
+start = time.perf_counter()
+import numpy, gym, pygame
+dependencies = time.perf_counter() - start
+
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter() - start
+
+import {settings} as settings
+mixer = bool(pygame.mixer.get_init())
+start = time.perf_counter()
+for name in {registries}:
+    getattr(settings, name).preload()
+loaded = time.perf_counter() - start
+print(dependencies, imported, loaded, mixer)
+"""
+
+
+def measure(directory, module, settings, registries):
+    code = PROBE.format(module=module, settings=settings, registries=registries)
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT / directory,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()[-4:]
+    return (*(float(value) for value in output[:3]), output[3] == "True")
+
+
+def main(repeats=5):
+    print(
+        "{:<40} {:>10} {:>10} {:>10} {:>6}".format(
+            "module", "deps (ms)", "own (ms)", "assets (ms)", "mixer"
+        )
+    )
+    for directory, module, settings, registries in ENVIRONMENTS:
+        runs = [measure(directory, module, settings, registries) for _ in range(repeats)]
+        print(
+            "{:<40} {:>10.1f} {:>10.1f} {:>10.1f} {:>6}".format(
+                "{}/{}".format(directory, module),
+                statistics.median(run[0] for run in runs) * 1000,
+                statistics.median(run[1] for run in runs) * 1000,
+                statistics.median(run[2] for run in runs) * 1000,
+                "yes" if any(run[3] for run in runs) else "no",
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
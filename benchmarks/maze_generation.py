@@ -0,0 +1,94 @@
+"""
+Generation throughput of every maze generator of environments/lecture3.
+
+Square mazes of growing side are generated with each generator and the best
+of a few seeded runs is reported in cells per second. Eller's generator is
+then streamed to disk for a tall maze, and the memory it allocates is
+traced for two heights to show it does not grow with the rows.
+
+    python benchmarks/maze_generation.py [max side] [streamed rows]
+"""
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "environments" / "lecture3"))
+
+import maze_generators  # noqa: E402
+
+GENERATORS = [
+    maze_generators.DepthFirstMazeGenerator,
+    maze_generators.RecursiveDivisionMazeGenerator,
+    maze_generators.KruskalMazeGenerator,
+    maze_generators.WilsonMazeGenerator,
+    maze_generators.EllerMazeGenerator,
+]
+
+
+def measure(generator_class, side, repeats=3):
+    best = float("inf")
+    for seed in range(repeats):
+        random.seed(seed)
+        np.random.seed(seed)
+        generator = generator_class(side, side)
+        start = time.perf_counter()
+        generator.generate()
+        best = min(best, time.perf_counter() - start)
+    return side * side / best
+
+
+def stream(rows, cols=256):
+    random.seed(0)
+    generator = maze_generators.EllerMazeGenerator(rows, cols)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "maze.npy")
+        start = time.perf_counter()
+        generator.save(path)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+    return rows * cols / elapsed, size
+
+
+def stream_peak(rows, cols=256):
+    # tracing slows every allocation down, it gets a run of its own
+    generator = maze_generators.EllerMazeGenerator(rows, cols)
+    with tempfile.TemporaryDirectory() as directory:
+        tracemalloc.start()
+        generator.save(os.path.join(directory, "maze.npy"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peak
+
+
+def main(max_side=1024, streamed_rows=100000):
+    names = [generator.__name__.replace("MazeGenerator", "") for generator in GENERATORS]
+    print("cells per second")
+    print("{:>6}".format("side") + "".join("{:>18}".format(name) for name in names))
+    side = 32
+    while side <= max_side:
+        rates = [measure(generator, side) for generator in GENERATORS]
+        print("{:>6}".format(side) + "".join("{:>18,.0f}".format(rate) for rate in rates))
+        side *= 2
+
+    rate, size = stream(streamed_rows)
+    print(
+        "\nEller streamed {} x 256 to disk: {:,.0f} cells/s, {:.1f} MB written".format(
+            streamed_rows, rate, size / 2 ** 20
+        )
+    )
+    for rows in (streamed_rows // 100, streamed_rows // 10):
+        print("peak memory streaming {} rows: {:.0f} KB".format(rows, stream_peak(rows) / 2 ** 10))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1024,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100000,
+    )
@@ -0,0 +1,107 @@
+"""
+Scaling of RecursiveDivisionMazeGenerator against the recursive version it replaced.
+
+The legacy generator is embedded below as it was, it divides recursively and
+writes walls cell by cell into a list of lists. Both are run on square mazes
+of growing side from environments/lecture3.
+
+    python benchmarks/maze_scaling.py [max side]
+"""
+from enum import Enum
+import pathlib
+import random
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "environments" / "lecture3"))
+
+from maze_generators import RecursiveDivisionMazeGenerator  # noqa: E402
+
+
+class LegacyRecursiveDivisionMazeGenerator:
+    DIRECTION = Enum('Direction', ['HORIZONTAL', 'VERTICAL'])
+
+    def __init__(self, num_rows, num_cols):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.grid = [[0 for _ in range(self.num_cols)] for _ in range(self.num_rows)]
+
+    def generate(self, start=0):
+        self.__divide(0, 0, self.num_cols, self.num_rows, self.__choose_direction(self.num_cols, self.num_rows))
+
+    def __choose_direction(self, width, height):
+        if (width < height):
+            return self.DIRECTION.HORIZONTAL
+        elif (height < width):
+            return self.DIRECTION.VERTICAL
+        else:
+            num = random.random() * 100
+            return self.DIRECTION.HORIZONTAL if (num % 2 == 0) else self.DIRECTION.VERTICAL
+
+    def __divide(self, x, y, width, height, direction):
+        if (width < 2 or height < 2):
+            return
+
+        horizontal = (direction == self.DIRECTION.HORIZONTAL)
+
+        wx = x + (0 if horizontal else random.randint(0, width - 2))
+        wy = y + (random.randint(0, height - 2) if horizontal else 0)
+
+        px = wx + (random.randint(0, width) if horizontal else 0)
+        py = wy + (0 if horizontal else random.randint(0, width))
+
+        length = width if horizontal else height
+
+        dx = 1 if horizontal else 0
+        dy = 0 if horizontal else 1
+
+        for _ in range(length):
+            self.grid[wy][wx] |= direction.value if (wx != px or wy != py) else 0
+            wx += dx
+            wy += dy
+
+        nx, ny = x, y
+        w, h = (width, (wy - y + 1)) if horizontal else ((wx - x + 1), height)
+
+        self.__divide(nx, ny, w, h, self.__choose_direction(w, h))
+
+        nx, ny = (x, (wy + 1)) if horizontal else ((wx + 1), y)
+        w, h = (width, (y + height - wy - 1)) if horizontal else ((x + width - wx - 1), height)
+
+        self.__divide(nx, ny, w, h, self.__choose_direction(w, h))
+
+
+def measure(generator_class, side, repeats=3):
+    best = float("inf")
+    for seed in range(repeats):
+        random.seed(seed)
+        generator = generator_class(side, side)
+        start = time.perf_counter()
+        generator.generate()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(max_side=2048):
+    print("{:>6} {:>12} {:>12} {:>9}".format("side", "legacy (s)", "current (s)", "speedup"))
+    side = 32
+    while side <= max_side:
+        try:
+            legacy = measure(LegacyRecursiveDivisionMazeGenerator, side)
+        except RecursionError:
+            legacy = None
+        current = measure(RecursiveDivisionMazeGenerator, side)
+        print(
+            "{:>6} {:>12} {:>12.4f} {:>9}".format(
+                side,
+                "recursion" if legacy is None else "{:.4f}".format(legacy),
+                current,
+                "-" if legacy is None else "{:.1f}x".format(legacy / current),
+            )
+        )
+        side *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2048)
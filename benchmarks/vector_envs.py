@@ -0,0 +1,84 @@
+"""
+Step throughput of the registered environments under gym's vector environments.
+
+Every environment is made with gym.vector.make from its own directory, the
+way the lecture scripts import it, once synchronous and once asynchronous
+with its observations in shared memory. Random actions are stepped and the
+total environment steps per second are reported. The run is headless.
+
+    python benchmarks/vector_envs.py [num envs] [steps]
+"""
+import os
+import pathlib
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+# (directory, environment module, id, keyword arguments)
+ENVIRONMENTS = [
+    ("environments/lecture1", "environment", "TwoArmedBandit-v1", {}),
+    ("environments/lecture2", "robot_battery", "RobotBattery-v2", {"seed": 0}),
+    ("environments/lecture3", "frozen_lake", "FrozenLake-v3", {"rows": 16, "cols": 16}),
+    ("environments/lecture4", "princess", "Princess-v0", {}),
+    ("project-v0", "farm", "farm-v0", {}),
+]
+
+PROBE = """
+import time
+import gym
+import {module}
+
+if __name__ == "__main__":
+    for asynchronous in (False, True):
+        envs = gym.vector.make(
+            "{env_id}",
+            num_envs={num_envs},
+            asynchronous=asynchronous,
+            disable_env_checker=True,
+            **{kwargs}
+        )
+        envs.reset(seed=0)
+        envs.action_space.seed(0)
+        actions = [envs.action_space.sample() for _ in range({steps})]
+        start = time.perf_counter()
+        for action in actions:
+            envs.step(action)
+        print({num_envs} * {steps} / (time.perf_counter() - start))
+        envs.close()
+"""
+
+
+def measure(directory, module, env_id, kwargs, num_envs, steps):
+    code = PROBE.format(
+        module=module, env_id=env_id, kwargs=kwargs, num_envs=num_envs, steps=steps
+    )
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT / directory,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()[-2:]
+    return tuple(float(value) for value in output)
+
+
+def main(num_envs=os.cpu_count(), steps=2000):
+    print("{} environments, {} steps".format(num_envs, steps))
+    print("{:<20} {:>14} {:>14} {:>9}".format("id", "sync (st/s)", "async (st/s)", "speedup"))
+    for directory, module, env_id, kwargs in ENVIRONMENTS:
+        sync, asynchronous = measure(directory, module, env_id, kwargs, num_envs, steps)
+        print(
+            "{:<20} {:>14,.0f} {:>14,.0f} {:>8.1f}x".format(
+                env_id, sync, asynchronous, asynchronous / sync
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count(),
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2000,
+    )
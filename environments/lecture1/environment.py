@@ -1,20 +1,19 @@
-import random
+from pathlib import Path
 import time
 
 import gym
+from gym.envs.registration import register
 import pygame
 
-pygame.init()
-pygame.display.init()
-pygame.font.init()
+BASE_DIR = Path(__file__).parent
 
 class Arm:
     def __init__(self, p=0, earn=0):
         self.probability = p
         self.earn = earn
 
-    def pull(self):
-        return self.earn if random.random() < self.probability else 0
+    def pull(self, np_random):
+        return self.earn if np_random.random() < self.probability else 0
 
     def __str__(self):
         return f"Arm: p: {self.probability}, earn: {self.earn}"
@@ -23,16 +22,9 @@ class Arm:
         return self.__str__()
 
 class TwoArmedBanditEnv(gym.Env):
-    MACHINE = pygame.image.load("./assets/graphics/slot-machine.png")
-    ARROW = pygame.image.load("./assets/graphics/up_arrow.png")
-    FONT = pygame.font.Font("./assets/fonts/font.ttf", 64)
-    
-    MACHINE_WIDTH, MACHINE_HEIGHT = MACHINE.get_size()
+    metadata = {"render_modes": ["human"], "render_fps": 1}
 
-    WINDOWS_WIDTH = MACHINE_WIDTH * 2 + 150
-    WINDOWS_HEIGHT = MACHINE_HEIGHT + 200
-
-    def __init__(self):
+    def __init__(self, render_mode=None):
         self.arms = (
             Arm(0.5, 1),
             Arm(0.1, 100)
@@ -43,6 +35,26 @@ class TwoArmedBanditEnv(gym.Env):
         self.reward = None
         self.total_reward = 0
 
+        # pygame, the assets and the window are only set up to be watched
+        self.render_mode = render_mode
+        self.window = None
+        if self.render_mode == "human":
+            self.init_render_mode()
+
+    def init_render_mode(self):
+        pygame.init()
+        pygame.display.init()
+        pygame.font.init()
+
+        self.MACHINE = pygame.image.load(BASE_DIR / "assets" / "graphics" / "slot-machine.png")
+        self.ARROW = pygame.image.load(BASE_DIR / "assets" / "graphics" / "up_arrow.png")
+        self.FONT = pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", 64)
+
+        self.MACHINE_WIDTH, self.MACHINE_HEIGHT = self.MACHINE.get_size()
+
+        self.WINDOWS_WIDTH = self.MACHINE_WIDTH * 2 + 150
+        self.WINDOWS_HEIGHT = self.MACHINE_HEIGHT + 200
+
         self.window = pygame.display.set_mode((self.WINDOWS_WIDTH, self.WINDOWS_HEIGHT))
         pygame.display.set_caption("Two-Armed Bandit Environment")
 
@@ -58,12 +70,16 @@ class TwoArmedBanditEnv(gym.Env):
 
     def step(self, action):
         self.action = action
-        self.reward = self.arms[action].pull()
-        self.render()
+        self.reward = self.arms[action].pull(self.np_random)
+        if self.render_mode == "human":
+            self.render()
         self.total_reward += self.reward
         return self._get_observations(), self.reward, False, False, self._get_info()
 
     def render(self):
+        if self.window is None:
+            return
+
         self.window.fill((0, 0, 0))
 
         # render first machine
@@ -105,6 +121,15 @@ class TwoArmedBanditEnv(gym.Env):
         time.sleep(0.5)
 
     def close(self):
+        if self.window is None:
+            return
+
         pygame.display.quit()
         pygame.font.quit()
-        pygame.quit()
\ No newline at end of file
+        pygame.quit()
+
+
+register(
+    id="TwoArmedBandit-v1",
+    entry_point="environment:TwoArmedBanditEnv"
+)
@@ -1,14 +1,10 @@
-from gym.envs.registration import register
 import gym
 
+# registers TwoArmedBandit-v1
+import environment
 from agent import TwoArmedBandit
 
-register(
-    id="TwoArmedBandit-v1",
-    entry_point="environment:TwoArmedBanditEnv"
-)
-
-env = gym.make("TwoArmedBandit-v1")
+env = gym.make("TwoArmedBandit-v1", render_mode="human")
 agent = TwoArmedBandit(0.1, 0.3)
 
 env.reset(seed=31)
@@ -1,19 +1,15 @@
 import os
 import time
 
-from gym.envs.registration import register
 import gym
 
+# registers RobotBattery-v2
+import robot_battery
 from agent import PolicyIteration as PolicyIterationAgent
 
 if "SDL_AUDIODRIVER" in os.environ:
     del os.environ["SDL_AUDIODRIVER"]
 
-register(
-    id="RobotBattery-v2",
-    entry_point="robot_battery:RobotBatteryEnv"
-)
-
 env = gym.make("RobotBattery-v2", render_mode="human")
 agent = PolicyIterationAgent(env.observation_space.n, env.action_space.n, env.P, 0.9)
 
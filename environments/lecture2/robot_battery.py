@@ -1,38 +1,61 @@
 import time
 import numpy as np
 import gym
+from gym.envs.registration import register
 
 import settings
+from mdp import CompiledMDP
 from world import World
 
 class RobotBatteryEnv(gym.Env):
     
     metadata = {"render_modes": ["human"], "render_fps": 4}
 
-    def __init__(self, render_mode=None):
+    # bump when __build_P changes, models stored by an older builder are then rebuilt
+    MODEL_VERSION = 1
+
+    def __init__(self, render_mode=None, seed=None):
         super().__init__()
+        # The goal is drawn here and fixes P, seed makes it reproducible. Every
+        # later draw comes from the same generator, reset(seed) replays those.
+        if seed is not None:
+            super().reset(seed=seed)
+        self.render_mode = render_mode
         self.action_space = gym.spaces.Discrete(settings.NUM_ACTIONS)
         self.observation_space = gym.spaces.Discrete(settings.NUM_TILES)
         self.action = 0
         self.reward = 0.0
-        self.state = np.random.randint(0, settings.NUM_TILES)
+        self.state = int(self.np_random.integers(0, settings.NUM_TILES))
         self.current_battery = settings.BATTERY_LOAD
         self.delay = settings.DEFAULT_DELAY
-        self.finish_state = self.__get_state(np.random.randint(0, settings.ROWS), np.random.randint(0, settings.COLS))
+        self.finish_state = self.__get_state(
+            self.np_random.integers(0, settings.ROWS), self.np_random.integers(0, settings.COLS)
+        )
         self.win = 0
         self.lose = 0
         self.__init_P()
-        self.world = World(
-            "Robot Battery Environment",
-            self.state,
-            self.action,
-            self.finish_state
-        )
+        # the window and the music only exist when someone is watching
+        self.world = None
+        if self.render_mode == "human":
+            self.world = World(
+                "Robot Battery Environment",
+                self.state,
+                self.action,
+                self.finish_state
+            )
 
         self.reset()
 
     def __init_P(self):
-        self.P = { state : { action: [] for action in range(settings.NUM_ACTIONS) } for state in range(settings.NUM_TILES) }
+        # the transition model only depends on the grid size and the goal, reuse it across constructions
+        key = CompiledMDP.cache_key(self.MODEL_VERSION, settings.ROWS, settings.COLS, self.finish_state)
+        self.P = CompiledMDP.cached(
+            settings.CACHE_DIR / "robot-battery-{}.mdp".format(key),
+            lambda: CompiledMDP.from_P(self.__build_P(), settings.NUM_TILES, settings.NUM_ACTIONS),
+        )
+
+    def __build_P(self):
+        P = { state : { action: [] for action in range(settings.NUM_ACTIONS) } for state in range(settings.NUM_TILES) }
         for row in range(settings.ROWS):
             for col in range(settings.COLS):
                 state = self.__get_state(row, col)
@@ -49,7 +72,8 @@ class RobotBatteryEnv(gym.Env):
                     to_state = to_state if (state != self.finish_state) else state
                     terminated = True if (to_state == self.finish_state) else False
                     probability = 1
-                    self.P[state][action].append((probability, to_state , reward, terminated))
+                    P[state][action].append((probability, to_state , reward, terminated))
+        return P
     
     def __get_state(self, row, col):
         return int(settings.COLS * row + col)
@@ -67,12 +91,12 @@ class RobotBatteryEnv(gym.Env):
                 raise RuntimeError("Variable options is not a dictionary")
             self.delay = options.get('delay', 0.5)
 
-        np.random.seed(seed)
         self.action = 0
         self.reward = 0.0
-        self.state = np.random.randint(0, settings.NUM_TILES)
+        self.state = int(self.np_random.integers(0, settings.NUM_TILES))
         self.current_battery = settings.BATTERY_LOAD
-        self.world.reset(self.state, self.action)
+        if self.world is not None:
+            self.world.reset(self.state, self.action)
         
         return self.state, {}
 
@@ -80,10 +104,10 @@ class RobotBatteryEnv(gym.Env):
         row, col = self.__get_coordinates(self.state)
         prev_state = self.state
 
-        if np.random.random() < 1 - self.current_battery / settings.BATTERY_LOAD:
+        if self.np_random.random() < 1 - self.current_battery / settings.BATTERY_LOAD:
             # Elegir quedarse en la misma posición o ir a una diferente a la elegida por la acción
             neighbors = [(row, col)]
-            expected_state = self.__get_coordinates(self.P[self.state][action][0][1])
+            expected_state = self.__get_coordinates(self.P.outcomes[self.state * settings.NUM_ACTIONS + action][0])
 
             if (row > 0):
                 neighbors.append((row - 1, col))
@@ -96,7 +120,7 @@ class RobotBatteryEnv(gym.Env):
             
             neighbors.remove(expected_state)
 
-            random_index = np.random.randint(0, len(neighbors))
+            random_index = self.np_random.integers(0, len(neighbors))
             to_state = self.__get_state(neighbors[random_index][0], neighbors[random_index][1])
             
             if (neighbors[random_index][0] == row - 1):
@@ -112,23 +136,23 @@ class RobotBatteryEnv(gym.Env):
             self.state = to_state
         else:
             # Ir a la dirección esperada por la acción
-            self.state = self.P[self.state][action][0][1]
+            self.state = self.P.outcomes[self.state * settings.NUM_ACTIONS + action][0]
             pass
         
         self.action = action
-        self.reward = self.P[prev_state][self.action][0][2]
-        terminated = self.P[prev_state][self.action][0][3]
-
-        self.world.update(
-            self.state,
-            self.action,
-            self.reward,
-            terminated
-        )
+        _, self.reward, terminated = self.P.outcomes[prev_state * settings.NUM_ACTIONS + self.action]
 
         self.current_battery -= 1
-        self.render()
-        time.sleep(self.delay)
+
+        if self.world is not None:
+            self.world.update(
+                self.state,
+                self.action,
+                self.reward,
+                terminated
+            )
+            self.render()
+            time.sleep(self.delay)
             
         if (terminated):
             self.win += 1
@@ -138,7 +162,16 @@ class RobotBatteryEnv(gym.Env):
         return self.state, self.reward, terminated, self.current_battery == 0, {}
 
     def render(self):
+        if self.world is None:
+            return
         self.world.render(self.current_battery/settings.BATTERY_LOAD, (self.win, self.lose))
 
     def close(self):
-        self.world.close()
\ No newline at end of file
+        if self.world is not None:
+            self.world.close()
+
+
+register(
+    id="RobotBattery-v2",
+    entry_point="robot_battery:RobotBatteryEnv"
+)
@@ -0,0 +1,146 @@
+"""
+Headless Robot Battery dynamics for N robots at once
+"""
+import numpy as np
+
+import settings
+
+
+class RobotBatteryBatch:
+    """
+    Positions, battery levels and goals of N robots kept in arrays.
+
+    Reproduces RobotBatteryEnv.step: with probability 1 - battery / BATTERY_LOAD
+    the battery fails and the robot drifts to a uniformly chosen neighbor (or
+    stays) other than the cell the action aimed at. Reward and termination are
+    read for the action the drift is reported as, like the single environment.
+    """
+
+    # Neighbor slots in the order RobotBatteryEnv lists them
+    STAY, UP, LEFT, DOWN, RIGHT = range(5)
+
+    def __init__(self, num_robots, goals=None, seed=None):
+        self.num_robots = num_robots
+        self.np_random = np.random.default_rng(seed)
+        if goals is None:
+            goals = self.np_random.integers(0, settings.NUM_TILES, size=num_robots)
+        self.goals = np.broadcast_to(np.asarray(goals, dtype=np.int64), (num_robots,)).copy()
+
+        self.__build_tables()
+        self.reset()
+
+    def __build_tables(self):
+        rows, cols = np.divmod(np.arange(settings.NUM_TILES, dtype=np.int64), settings.COLS)
+        # cell reached by every slot, itself when the slot is out of the grid
+        slots = np.stack([
+            np.zeros_like(rows),
+            np.where(rows > 0, -settings.COLS, 0),
+            np.where(cols > 0, -1, 0),
+            np.where(rows < settings.COLS - 1, settings.COLS, 0),
+            np.where(cols < settings.ROWS - 1, 1, 0),
+        ], axis=1) + np.arange(settings.NUM_TILES)[:, None]
+        exists = np.stack([
+            np.ones_like(rows, dtype=bool),
+            rows > 0,
+            cols > 0,
+            rows < settings.COLS - 1,
+            cols < settings.ROWS - 1,
+        ], axis=1)
+
+        # actions: 0 left, 1 down, 2 right, 3 up
+        action_slots = np.array([self.LEFT, self.DOWN, self.RIGHT, self.UP])
+        self.moves = np.where(
+            exists[:, action_slots], slots[:, action_slots], np.arange(settings.NUM_TILES)[:, None]
+        )
+        # slot the action aims at, STAY when a border blocks it
+        self.expected_slots = np.where(exists[:, action_slots], action_slots, self.STAY)
+
+        # drift candidates once the expected slot is removed, indexed by [state, expected slot]
+        self.drift_states = np.zeros((settings.NUM_TILES, 5, 4), dtype=np.int64)
+        self.drift_slots = np.zeros((settings.NUM_TILES, 5, 4), dtype=np.int64)
+        self.drift_counts = np.zeros((settings.NUM_TILES, 5), dtype=np.int64)
+        for removed in range(5):
+            keep = exists & (np.arange(5) != removed)
+            # stable sort moves the kept slots to the front in their original order
+            order = np.argsort(~keep, axis=1, kind="stable")[:, :4]
+            self.drift_slots[:, removed] = order
+            self.drift_states[:, removed] = np.take_along_axis(slots, order, axis=1)
+            self.drift_counts[:, removed] = keep.sum(axis=1)
+
+        # action a drift is reported as, -1 keeps the chosen action. The right
+        # move compares the neighbor row against col + 1, as the environment does.
+        labels = np.full((settings.NUM_TILES, 5), -1, dtype=np.int64)
+        labels[:, self.UP] = 3
+        labels[:, self.LEFT] = 0
+        labels[:, self.DOWN] = 1
+        labels[:, self.RIGHT] = np.where(rows == cols + 1, 2, -1)
+        labels[:, self.STAY] = np.where(rows == cols + 1, 2, -1)
+        self.drift_labels = labels
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        self.states = self.np_random.integers(0, settings.NUM_TILES, size=self.num_robots)
+        self.batteries = np.full(self.num_robots, settings.BATTERY_LOAD, dtype=np.int64)
+        self.actions = np.zeros(self.num_robots, dtype=np.int64)
+        return self.states.copy()
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        at_goal = self.states == self.goals
+
+        # one draw per robot for the failure and one for the drift neighbor
+        u = self.np_random.random((2, self.num_robots))
+        failed = u[0] < 1 - self.batteries / settings.BATTERY_LOAD
+
+        expected = np.where(at_goal, self.STAY, self.expected_slots[self.states, actions])
+        counts = self.drift_counts[self.states, expected]
+        choice = np.minimum((u[1] * counts).astype(np.int64), counts - 1)
+        drift_states = self.drift_states[self.states, expected, choice]
+        labels = self.drift_labels[self.states, self.drift_slots[self.states, expected, choice]]
+
+        reported = np.where(failed & (labels >= 0), labels, actions)
+        intended = np.where(at_goal, self.states, self.moves[self.states, reported])
+        rewards = ((intended == self.goals) & ~at_goal).astype(np.float64)
+        terminated = intended == self.goals
+
+        next_states = np.where(at_goal, self.states, self.moves[self.states, actions])
+        self.states = np.where(failed, drift_states, next_states)
+        self.actions = reported
+        self.batteries -= 1
+        truncated = self.batteries == 0
+
+        return self.states.copy(), rewards, terminated, truncated, {"actions": reported.copy()}
+
+    def evaluate(self, policy, goals, seed=None):
+        """
+        Runs one episode per robot under policy[state] (or policy[robot, state]).
+
+        A policy only makes sense for the goal it was solved for, goals is that
+        goal (the finish_state of the env that gave P) or one goal per robot.
+        Returns the win/lose counts and the mean return and length of the episodes.
+        """
+        policy = np.asarray(policy).astype(np.int64)
+        robots = np.arange(self.num_robots)
+        self.goals = np.broadcast_to(np.asarray(goals, dtype=np.int64), (self.num_robots,)).copy()
+        self.reset(seed)
+
+        running = np.ones(self.num_robots, dtype=bool)
+        wins = np.zeros(self.num_robots, dtype=bool)
+        returns = np.zeros(self.num_robots)
+        lengths = np.zeros(self.num_robots, dtype=np.int64)
+        while running.any():
+            actions = policy[self.states] if policy.ndim == 1 else policy[robots, self.states]
+            _, rewards, terminated, truncated, _ = self.step(actions)
+            returns += np.where(running, rewards, 0.0)
+            lengths += running
+            wins |= running & terminated
+            running &= ~(terminated | truncated)
+
+        return {
+            "wins": int(wins.sum()),
+            "loses": int((~wins).sum()),
+            "win_rate": float(wins.mean()),
+            "mean_return": float(returns.mean()),
+            "mean_steps": float(lengths.mean()),
+        }
@@ -1,6 +1,6 @@
 import pathlib
 
-import pygame
+from lazy_assets import LazyAssets, font, image, images, sound
 
 # Size of the square tiles used in this environment.
 TILE_SIZE = 32
@@ -37,33 +37,30 @@ DEFAULT_DELAY = 0.5
 
 BASE_DIR = pathlib.Path(__file__).parent
 
-# Textures used in the environment
-TEXTURES = {
-    'floor': pygame.image.load(BASE_DIR / "assets" / "graphics" / "floor.png"),
-    'goal': pygame.image.load(BASE_DIR / "assets" / "graphics" / "goal.png"),
-    'character': [
-        pygame.image.load(BASE_DIR / "assets" / "graphics" / "panda_left.png"),
-        pygame.image.load(BASE_DIR / "assets" / "graphics" / "panda_down.png"),
-        pygame.image.load(BASE_DIR / "assets" / "graphics" / "panda_right.png"),
-        pygame.image.load(BASE_DIR / "assets" / "graphics" / "panda_up.png"),
-    ]
-}
+# Compiled transition models, keyed by the content they were built from
+CACHE_DIR = BASE_DIR / ".cache"
 
-# Initializing the mixer
-pygame.mixer.init()
+# Textures used in the environment, loaded on first use
+TEXTURES = LazyAssets({
+    'floor': image(BASE_DIR / "assets" / "graphics" / "floor.png"),
+    'goal': image(BASE_DIR / "assets" / "graphics" / "goal.png"),
+    'character': images(
+        BASE_DIR / "assets" / "graphics" / "panda_left.png",
+        BASE_DIR / "assets" / "graphics" / "panda_down.png",
+        BASE_DIR / "assets" / "graphics" / "panda_right.png",
+        BASE_DIR / "assets" / "graphics" / "panda_up.png",
+    )
+})
 
-# Loading music
-pygame.mixer.music.load(BASE_DIR / "assets" / "sounds" / "main_theme.ogg")
+# Music, the mixer is only initialized when it starts playing
+MUSIC = BASE_DIR / "assets" / "sounds" / "main_theme.ogg"
 
 # Sound effects
-SOUNDS = {
-    'win': pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "won.wav")
-}
-
-# Initializing fonts
-pygame.font.init()
+SOUNDS = LazyAssets({
+    'win': sound(BASE_DIR / "assets" / "sounds" / "won.wav")
+})
 
 # Fonts
-FONTS = {
-    'font': pygame.font.Font(BASE_DIR /"assets"/"fonts"/"font.ttf", 16)
-}
\ No newline at end of file
+FONTS = LazyAssets({
+    'font': font(BASE_DIR /"assets"/"fonts"/"font.ttf", 16)
+})
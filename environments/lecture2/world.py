@@ -1,5 +1,6 @@
 import pygame
 
+import lazy_assets
 import settings
 from tilemap import TileMap
 
@@ -7,7 +8,7 @@ class World:
     def __init__(self, title, state, action, finish_state=None):
         pygame.init()
         pygame.display.init()
-        pygame.mixer.music.play(loops=-1)
+        lazy_assets.play_music(settings.MUSIC)
         self.render_surface = pygame.Surface(
             (settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT)
         )
@@ -90,8 +91,7 @@ class World:
         pygame.display.update()
 
     def close(self):
-        pygame.mixer.music.stop()
-        pygame.mixer.quit()
+        lazy_assets.stop_music()
         pygame.display.quit()
         pygame.quit()
 
@@ -1,31 +1,53 @@
 """
 Frozen Lake environment as a maze
 """
+from collections import deque
+from contextlib import contextmanager
 from typing import List, Tuple
 import numpy as np
+import os
+import random
 import time
 
 import gym
+from gym.envs.registration import register
 import pygame
 
+import lazy_assets
+import maze_corpus
 import maze_generators
 import settings
+from maze_generators.MazeGenerator import MazeGenerator
+from mdp import CompiledMDP, LazyP
 from tilemap import TileMap
 
+
+@contextmanager
+def seeded(seed: int):
+    # maze generators draw from the global random and NumPy states, seed them
+    # for the block and put back what was there
+    random_state, np_random_state = random.getstate(), np.random.get_state()
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(random_state)
+        np.random.set_state(np_random_state)
+
+
 class FrozenLake(gym.Env):
     metadata = {"render_modes": ["human"], "render_fps": 4}
 
     def __init__(self, **kwargs):
-        self._rows = kwargs.get("rows", 4)
-        self._cols = kwargs.get("cols", 4)
+        # corpus=(path, index) loads a level stored by maze_corpus.build_corpus
+        # instead of generating one, rows and cols are the corpus ones
+        corpus = kwargs.get("corpus")
+        self.level = None if corpus is None else maze_corpus.load_corpus(corpus[0])[corpus[1]]
+        self._rows = kwargs.get("rows", 4) if self.level is None else self.level.rows
+        self._cols = kwargs.get("cols", 4) if self.level is None else self.level.cols
         self.render_mode = kwargs.get("render_mode")
-        
-        # maze init
-        self.maze_generator = kwargs.get(
-            "maze_generator_class", maze_generators.RecursiveDivisionMazeGenerator
-        )(self._rows, self._cols)
-        self.maze_generator.generate()
-        self.grid = self.maze_generator.get_grid()
+        self.lazy = kwargs.get("lazy", False)
 
         # env constants
         self.NUM_TILES = self._rows * self._cols
@@ -38,15 +60,23 @@ class FrozenLake(gym.Env):
         # env init
         self.observation_space = gym.spaces.Discrete(self.NUM_TILES)
         self.action_space = gym.spaces.Discrete(self.NUM_ACTIONS)
-        
-        self.connected_components = self.__get_connected_components()
-        self.connected_components.sort(reverse=True, key=len)
 
-        self.initial_state = self.connected_components[0][0]
-        self.finish_state = max(self.connected_components[0])
-        self.path = self.__build_path(self.initial_state, self.finish_state)
-        holes_candidates = [ tile for tile in range(self.NUM_TILES) if (tile not in self.path) ]
-        self.holes = np.random.choice(holes_candidates, size=(len(holes_candidates) * 33 // 100)).tolist()
+        # state offset of every action: left, down, right, up
+        self.MOVES = np.array([-1, self._cols, 1, -self._cols], dtype=np.int64)
+
+        if self.level is None:
+            # The maze and the holes come from a seed of their own, fresh entropy
+            # unless one is given, so lakes built in parallel workers never repeat
+            self.level_seed = kwargs.get("seed")
+            if self.level_seed is None:
+                self.level_seed = int(np.random.SeedSequence().generate_state(1)[0])
+            with seeded(self.level_seed):
+                self.__generate_level(
+                    kwargs.get("maze_generator_class", maze_generators.RecursiveDivisionMazeGenerator)
+                )
+        else:
+            self.level_seed = self.level.seed
+            self.__load_level()
 
         self.current_state = self.initial_state
         self.current_action = 1
@@ -64,12 +94,23 @@ class FrozenLake(gym.Env):
         self.tilemap = None
         self.__create_tilemap()
 
+        # Ice, holes, stool and walls are drawn once into the background, a frame
+        # only redraws the tiles in dirty_tiles and the ones whose overlays moved
+        self.background = None
+        self.walls_layer = None
+        self.dirty_tiles = set()
+        self.drawn = None
+
     def init_render_mode(self, render_mode):
         self.render_mode = render_mode
 
+        # Allowing environment to have sounds
+        if "SDL_AUDIODRIVER" in os.environ:
+            del os.environ["SDL_AUDIODRIVER"]
+
         pygame.init()
         pygame.display.init()
-        pygame.mixer.music.play(loops=-1)
+        lazy_assets.play_music(settings.MUSIC)
         self.render_surface = pygame.Surface(
             (self.VIRTUAL_WIDTH, self.VIRTUAL_HEIGHT)
         )
@@ -77,6 +118,8 @@ class FrozenLake(gym.Env):
             (self.WINDOW_WIDTH, self.WINDOW_HEIGHT)
         )
         pygame.display.set_caption("Frozen Lake Environment")
+        self.background = None
+        self.drawn = None
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
@@ -92,14 +135,18 @@ class FrozenLake(gym.Env):
         self.render_character = True
         self.render_goal = True
 
-        for tile in self.tilemap.tiles:
+        for state, tile in enumerate(self.tilemap.tiles):
             if tile.texture_name == "cracked_hole":
                 tile.texture_name = "hole"
+                self.dirty_tiles.add(state)
 
         return self.current_state, {}
 
     def step(self, action):
-        _, to_state , reward, terminated = self.P[self.current_state][action][0]
+        if self.lazy:
+            _, to_state , reward, terminated = self.P[self.current_state][action][0]
+        else:
+            to_state, reward, terminated = self.P.outcomes[self.current_state * self.NUM_ACTIONS + action]
 
         self.current_state = to_state
         self.current_action = action
@@ -111,6 +158,7 @@ class FrozenLake(gym.Env):
                     settings.SOUNDS["win"].play()
                 else:
                     self.tilemap.tiles[to_state].texture_name = "cracked_hole"
+                    self.dirty_tiles.add(to_state)
                     self.render_character = False
                     settings.SOUNDS["ice_cracking"].play()
                     settings.SOUNDS["water_splash"].play()
@@ -120,228 +168,279 @@ class FrozenLake(gym.Env):
 
         return to_state, reward, terminated, False, {}
 
-    def render(self):        
-        self.render_surface.fill((0, 0, 0))
+    def render(self):
+        if self.background is None:
+            self.__create_background()
 
-        self.tilemap.render(self.render_surface)
+        # the goal and the character are the only things drawn over the background
+        drawn = (
+            self.current_state if self.render_character else None,
+            self.current_action,
+            self.render_goal,
+        )
+        tiles = self.dirty_tiles
+        for state in tiles:
+            self.__redraw_background(state)
+        self.dirty_tiles = set()
+
+        if self.drawn is None:
+            self.render_surface.blit(self.background, (0, 0))
+            self.__render_overlays(self.render_surface.get_rect())
+            self.screen.blit(
+                pygame.transform.scale(self.render_surface, self.screen.get_size()), (0, 0)
+            )
+            pygame.event.pump()
+            pygame.display.update()
+        else:
+            if self.drawn[:2] != drawn[:2]:
+                tiles |= {self.drawn[0], drawn[0]} - {None}
+            if self.drawn[2] != drawn[2]:
+                tiles.add(self.finish_state)
+
+            updated = []
+            for state in tiles:
+                rect = self.__tile_rect(state)
+                self.render_surface.blit(self.background, rect, rect)
+                self.__render_overlays(rect)
+                screen_rect = pygame.Rect(
+                    rect.x * settings.H_SCALE,
+                    rect.y * settings.V_SCALE,
+                    rect.w * settings.H_SCALE,
+                    rect.h * settings.V_SCALE,
+                )
+                self.screen.blit(
+                    pygame.transform.scale(self.render_surface.subsurface(rect), screen_rect.size),
+                    screen_rect,
+                )
+                updated.append(screen_rect)
+            pygame.event.pump()
+            pygame.display.update(updated)
+
+        self.drawn = drawn
 
-        self.render_surface.blit(
-            settings.TEXTURES["stool"],
-            (self.tilemap.tiles[self.initial_state].x, self.tilemap.tiles[self.initial_state].y),
+    def close(self):
+        lazy_assets.stop_music()
+        pygame.display.quit()
+        pygame.quit()
+    
+    def __generate_level(self, maze_generator_class) -> None:
+        self.maze_generator = maze_generator_class(self._rows, self._cols)
+        self.maze_generator.generate()
+        self.grid = self.maze_generator.get_grid()
+        self.adjacency = self.__compile_adjacency()
+
+        # the lake is the largest connected region of the maze, from its first to its last cell
+        self.component_labels = self.__label_components()
+        sizes = np.bincount(self.component_labels, minlength=self.NUM_TILES)
+        component = int(np.argmax(sizes))
+        cells = np.flatnonzero(self.component_labels == component)
+
+        self.initial_state = int(cells[0])
+        self.finish_state = int(cells[-1])
+        # maze distance of every cell to the goal (holes ignored, -1 when unreachable)
+        # and the next cell on a shortest way there
+        self.goal_distances, self.goal_parents = self.__distance_field(self.finish_state)
+        self.path = self.__build_path(self.initial_state)
+        on_path = np.zeros(self.NUM_TILES, dtype=bool)
+        on_path[self.path] = True
+        holes_candidates = np.flatnonzero(~on_path)
+        # drawn with replacement, holes lists every hole once in state order like a corpus level
+        holes = np.random.choice(holes_candidates, size=(len(holes_candidates) * 33 // 100))
+        self.hole_mask = np.zeros(self.NUM_TILES, dtype=bool)
+        self.hole_mask[holes] = True
+        self.holes = np.flatnonzero(self.hole_mask).tolist()
+
+    def __load_level(self) -> None:
+        # every array is a view into the mapped corpus, nothing is recomputed
+        self.maze_generator = None
+        self.grid = self.level.grid
+        self.adjacency = self.level.adjacency
+        self.component_labels = self.level.component_labels
+        self.initial_state = self.level.initial_state
+        self.finish_state = self.level.finish_state
+        self.goal_distances = self.level.goal_distances
+        self.goal_parents = self.level.goal_parents
+        self.path = self.__build_path(self.initial_state)
+        self.hole_mask = self.level.hole_mask
+        self.holes = np.flatnonzero(self.hole_mask).tolist()
+
+    def __init_P(self) -> None:
+        if self.lazy:
+            # transitions are only computed for the (state, action) pairs the agent visits
+            self.P = LazyP(self.NUM_TILES, self.NUM_ACTIONS, self.__transitions)
+            return
+        # compiling is cheaper than generating the maze, only corpus levels are stored
+        self.P = self.compile_P() if self.level is None else self.level.mdp
+
+    def compile_P(self) -> CompiledMDP:
+        # transition model of the lake, one outcome per (state, action) pair
+        states = np.arange(self.NUM_TILES, dtype=np.int64)
+        bits = (self.adjacency[:, None] >> np.arange(self.NUM_ACTIONS)) & 1
+        next_states = np.where(bits == 1, states[:, None] + self.MOVES, states[:, None])
+        rewards = (next_states == self.finish_state).astype(np.float64)
+        terminals = (next_states == self.finish_state) | self.hole_mask[next_states]
+        # the goal is absorbing and keeps paying
+        next_states[self.finish_state] = self.finish_state
+        rewards[self.finish_state] = 1.0
+        terminals[self.finish_state] = True
+        return CompiledMDP(
+            self.NUM_TILES,
+            self.NUM_ACTIONS,
+            np.arange(next_states.size + 1, dtype=np.int64),
+            np.ones(next_states.size, dtype=np.float64),
+            next_states.ravel(),
+            rewards.ravel(),
+            terminals.ravel(),
         )
 
+    def __transitions(self, state: int, action: int) -> List[Tuple[float, int, float, bool]]:
+        if (state == self.finish_state):
+            return [(1.0, state, 1.0, True)]
+        to_state = state + int(self.MOVES[action]) if (self.adjacency[state] >> action & 1) else state
+        reward = 1.0 if (to_state == self.finish_state) else 0.0
+        terminated = bool(to_state == self.finish_state or self.hole_mask[to_state])
+        return [(1.0, to_state , reward, terminated)]
+
+    def __compile_adjacency(self) -> np.ndarray:
+        # bit a of a cell is set when action a leads to a neighbor (no wall, inside the maze)
+        grid = np.asarray(self.grid, dtype=np.int64).reshape(self._rows, self._cols)
+        horizontal = grid & MazeGenerator.DIRECTION.HORIZONTAL.value != 0
+        vertical = grid & MazeGenerator.DIRECTION.VERTICAL.value != 0
+        open_ = np.zeros((self.NUM_ACTIONS, self._rows, self._cols), dtype=bool)
+        open_[0, :, 1:] = ~vertical[:, :-1]
+        open_[1, :-1, :] = ~horizontal[:-1, :]
+        open_[2, :, :-1] = ~vertical[:, :-1]
+        open_[3, 1:, :] = ~horizontal[:-1, :]
+        adjacency = np.zeros(self.NUM_TILES, dtype=np.uint8)
+        for action in range(self.NUM_ACTIONS):
+            adjacency |= open_[action].ravel().astype(np.uint8) << action
+        return adjacency
+
+    def __tile_rect(self, state: int) -> pygame.Rect:
+        tile = self.tilemap.tiles[state]
+        return pygame.Rect(tile.x, tile.y, settings.TILE_SIZE, settings.TILE_SIZE)
+
+    def __create_background(self) -> None:
+        # walls get a transparent layer of their own, they are drawn over the
+        # character and a redrawn tile needs the ones on its edges back
+        self.walls_layer = pygame.Surface((self.VIRTUAL_WIDTH, self.VIRTUAL_HEIGHT), pygame.SRCALPHA)
+        self.__render_walls(self.walls_layer)
+
+        self.background = pygame.Surface((self.VIRTUAL_WIDTH, self.VIRTUAL_HEIGHT))
+        self.background.fill((0, 0, 0))
+        self.tilemap.render(self.background)
+        self.background.blit(settings.TEXTURES["stool"], self.__tile_rect(self.initial_state))
+        self.background.blit(self.walls_layer, (0, 0))
+        self.dirty_tiles = set()
+
+    def __redraw_background(self, state: int) -> None:
+        # a tile changed its texture, draw it again with the stool and walls over it
+        rect = self.__tile_rect(state)
+        self.tilemap.tiles[state].render(self.background)
+        if state == self.initial_state:
+            self.background.blit(settings.TEXTURES["stool"], rect)
+        self.background.blit(self.walls_layer, rect, rect)
+
+    def __render_overlays(self, rect: pygame.Rect) -> None:
+        # goal and character within rect, with the walls back over them
+        self.render_surface.set_clip(rect)
         if self.render_goal:
-            self.render_surface.blit(
-                settings.TEXTURES["goal"],
-                (
-                    self.tilemap.tiles[self.finish_state].x,
-                    self.tilemap.tiles[self.finish_state].y,
-                ),
-            )
-
+            self.render_surface.blit(settings.TEXTURES["goal"], self.__tile_rect(self.finish_state))
         if self.render_character:
             self.render_surface.blit(
                 settings.TEXTURES["character"][self.current_action],
-                (self.tilemap.tiles[self.current_state].x, self.tilemap.tiles[self.current_state].y),
+                self.__tile_rect(self.current_state),
             )
+        self.render_surface.set_clip(None)
+        self.render_surface.blit(self.walls_layer, rect, rect)
 
-        self.__render_walls()
-        
-        self.screen.blit(
-            pygame.transform.scale(self.render_surface, self.screen.get_size()), (0, 0)
-        )
-        
-        pygame.event.pump()
-        pygame.display.update()
-    
-    def close(self):
-        pygame.mixer.music.stop()
-        pygame.mixer.quit()
-        pygame.display.quit()
-        pygame.quit()
-    
-    def __init_P(self) -> None:
-        self.P = { state : { action: [] for action in range(self.NUM_ACTIONS) } for state in range(self.NUM_TILES) }
-        for row in range(self._rows):
-            for col in range(self._cols):
-                state = self.__get_state(row, col)
-                for action in range(self.NUM_ACTIONS):
-                    if (action == 0):
-                        to_state = self.__get_state(row, col - 1) if (col > 0) else state
-                        if (to_state != state):
-                            _, vertical_wall = self.__get_walls(row, col - 1)
-                            if (vertical_wall):
-                                to_state = state
-                    elif (action == 1):
-                        to_state = self.__get_state(row + 1, col) if (row < self._rows - 1) else state
-                        if (to_state != state):
-                            horizontal_wall, _ = self.__get_walls(row, col)
-                            if (horizontal_wall):
-                                to_state = state
-                    elif (action == 2):
-                        to_state = self.__get_state(row, col + 1) if (col < self._cols - 1) else state
-                        if (to_state != state):
-                            _, vertical_wall = self.__get_walls(row, col)
-                            if (vertical_wall):
-                                to_state = state
-                    else:
-                        to_state = self.__get_state(row - 1, col) if (row > 0) else state
-                        if (to_state != state):
-                            horizontal_wall, _ = self.__get_walls(row - 1, col)
-                            if (horizontal_wall):
-                                to_state = state
-
-                    if (state == self.finish_state):
-                        self.P[state][action].append((1.0, state, 1.0, True))
-                    else:
-                        reward = 1.0 if (to_state == self.finish_state) else 0.0
-                        terminated = True if (to_state == self.finish_state or (to_state in self.holes)) else False
-                        self.P[state][action].append((1.0, to_state , reward, terminated))
-
-    def __get_state(self, row: int, col: int) -> int:
-        return int(self._cols * row + col)
-
-    def __get_coordinates(self, state: int) -> Tuple[int, int]:
-        row = np.floor(state/self._cols);
-        col = (state - self._cols*row)
-        return int(row.item()), int(col.item())
-    
     def __create_tilemap(self) -> None:
         tile_texture_names = ["ice" for _ in range(self.NUM_TILES)]
-        for _, actions_table in self.P.items():
-            for _, possibilities in actions_table.items():
-                for _, state, reward, terminated in possibilities:
-                    if terminated:
-                        if reward > 0:
-                            self.finish_state = state
-                        else:
-                            tile_texture_names[state] = "hole"
+        for state in self.holes:
+            tile_texture_names[state] = "hole"
 
         tile_texture_names[self.finish_state] = "ice"
         self.tilemap = TileMap(self._rows, self._cols, tile_texture_names)
 
-    def __get_walls(self, x: int, y: int) -> Tuple[bool, bool]:
-        horizontal = self.grid[x][y] & self.maze_generator.DIRECTION.HORIZONTAL.value != 0
-        vertical = self.grid[x][y] & self.maze_generator.DIRECTION.VERTICAL.value != 0
-        return (horizontal, vertical)
-
-    def __get_connected_components(self) -> List[List[int]]:
-        components = []
-        current_component = []
-        visited = [False for _ in range(self.NUM_TILES)]
-
-        for state in range(self.NUM_TILES):
-            if (not visited[state]):
-                self.__dfs(state, visited, current_component)
-                components.append(current_component)
-                current_component = []
-
-        return components
-
-    def __dfs(self, state: int, visited: List[bool], current_component: List[int]) -> None:
-        current_component.append(state)
-        visited[state] = True
-        x, y = self.__get_coordinates(state)
-        neighbors = []
-
-        if (y > 0):
-            # check if there is a path to left neighbor
-            _, vertical_wall = self.__get_walls(x, y - 1)
-            if (not vertical_wall):
-                neighbors.append(self.__get_state(x, y - 1))
-
-        if (x < self._rows - 1):
-            # check if there is a path to bottom neighbor
-            horizontal_wall, _ = self.__get_walls(x, y)
-            if (not horizontal_wall):
-                neighbors.append(self.__get_state(x + 1, y))
-
-        if (y < self._cols - 1):
-            # check if there is a path to right neighbor
-            _, vertical_wall = self.__get_walls(x, y)
-            if (not vertical_wall):
-                neighbors.append(self.__get_state(x, y + 1))
-        
-        if (x > 0):
-            # check if there is a path to up neighbor
-            horizontal_wall, _ = self.__get_walls(x - 1, y)
-            if (not horizontal_wall):
-                neighbors.append(self.__get_state(x - 1, y))
-
-        for neighbor in neighbors:
-            if (not visited[neighbor]):
-                self.__dfs(neighbor, visited, current_component)
-
-    def __build_path(self, from_state: int, to_state: int) -> List[int]:
-        parent = [ -1 for _ in range(self.NUM_TILES) ]
-        queue = [ from_state ]
-        visited = [False for _ in range(self.NUM_TILES)]
-        
-        parent[from_state] = from_state
-        path = []
-
+    def __label_components(self) -> np.ndarray:
+        # Union-find over the open edges, vectorized: every round hooks each root
+        # to the smallest root across its edges, then flattens the trees into
+        # stars. A component ends up labeled by its smallest cell.
+        states = np.arange(self.NUM_TILES, dtype=np.int64)
+        edges = [
+            (states[self.adjacency >> action & 1 == 1], self.MOVES[action])
+            for action in (1, 2)
+        ]
+        a = np.concatenate([cells for cells, _ in edges])
+        b = np.concatenate([cells + move for cells, move in edges])
+
+        labels = states.copy()
+        while True:
+            roots_a, roots_b = labels[a], labels[b]
+            pending = roots_a != roots_b
+            if not pending.any():
+                return labels
+            a, b = a[pending], b[pending]
+            roots_a, roots_b = roots_a[pending], roots_b[pending]
+            np.minimum.at(labels, np.maximum(roots_a, roots_b), np.minimum(roots_a, roots_b))
+            while True:
+                jumped = labels[labels]
+                if np.array_equal(jumped, labels):
+                    break
+                labels = jumped
+
+    def __distance_field(self, goal: int) -> Tuple[np.ndarray, np.ndarray]:
+        # BFS from the goal, cells are marked when enqueued so each one is
+        # visited once. Plain lists are much cheaper than NumPy scalars here.
+        moves = self.MOVES.tolist()
+        open_moves = [
+            [moves[action] for action in range(self.NUM_ACTIONS) if bits >> action & 1]
+            for bits in range(1 << self.NUM_ACTIONS)
+        ]
+        adjacency = self.adjacency.tolist()
+        distances = [-1] * self.NUM_TILES
+        parents = [-1] * self.NUM_TILES
+
+        distances[goal] = 0
+        parents[goal] = goal
+        queue = deque([goal])
         while (len(queue) > 0):
-            current_state = queue.pop(0)
-            visited[current_state] = True
-            
-            if (current_state == to_state):
-                break
-
-            x, y = self.__get_coordinates(current_state)
-            neighbors = []
-
-            if (y > 0):
-                # check if there is a path to left neighbor
-                _, vertical_wall = self.__get_walls(x, y - 1)
-                if (not vertical_wall):
-                    neighbors.append(self.__get_state(x, y - 1))
-
-            if (x < self._rows - 1):
-                # check if there is a path to bottom neighbor
-                horizontal_wall, _ = self.__get_walls(x, y)
-                if (not horizontal_wall):
-                    neighbors.append(self.__get_state(x + 1, y))
-
-            if (y < self._cols - 1):
-                # check if there is a path to right neighbor
-                _, vertical_wall = self.__get_walls(x, y)
-                if (not vertical_wall):
-                    neighbors.append(self.__get_state(x, y + 1))
-            
-            if (x > 0):
-                # check if there is a path to up neighbor
-                horizontal_wall, _ = self.__get_walls(x - 1, y)
-                if (not horizontal_wall):
-                    neighbors.append(self.__get_state(x - 1, y))
-
-            for neighbor in neighbors:
-                if (not visited[neighbor]):
-                    parent[neighbor] = current_state
+            current_state = queue.popleft()
+            distance = distances[current_state] + 1
+            for move in open_moves[adjacency[current_state]]:
+                neighbor = current_state + move
+                if (distances[neighbor] < 0):
+                    distances[neighbor] = distance
+                    parents[neighbor] = current_state
                     queue.append(neighbor)
-        
-        path = [ to_state ]
-        current_state = to_state
 
-        while (parent[current_state] != current_state):
-            current_state = parent[current_state]
-            path.append(current_state)
-        
+        return np.array(distances, dtype=np.int64), np.array(parents, dtype=np.int64)
+
+    def __build_path(self, from_state: int) -> List[int]:
+        # follow the parents down to the goal, listed from the goal back to from_state
+        parents = self.goal_parents
+        path = [ from_state ]
+        while (parents[path[-1]] != path[-1]):
+            path.append(int(parents[path[-1]]))
+        path.reverse()
         return path
-    
-    def __render_walls(self):
-        for tile in range(self.NUM_TILES):
-            row, col = self.__get_coordinates(tile)
-            bottom  = (self.grid[row][col] & self.maze_generator.DIRECTION.HORIZONTAL.value != 0)
-            right   = (self.grid[row][col] & self.maze_generator.DIRECTION.VERTICAL.value != 0)
-            x, y = col * settings.TILE_SIZE, row * settings.TILE_SIZE
-           
-            if (bottom):
-                # render bottom wall
-                start_pos = (x, y + settings.TILE_SIZE)
-                end_pos = (x + settings.TILE_SIZE, y + settings.TILE_SIZE)
-                pygame.draw.line(self.render_surface, pygame.Color(0, 0, 0), start_pos , end_pos)
-            if (right):
-                # render right wall
-                start_pos = (x + settings.TILE_SIZE, y)
-                end_pos = (x + settings.TILE_SIZE, y + settings.TILE_SIZE)
-                pygame.draw.line(self.render_surface, pygame.Color(0, 0, 0), start_pos , end_pos)
+
+    def __render_walls(self, surface):
+        grid = np.asarray(self.grid).reshape(self._rows, self._cols)
+        color = pygame.Color(0, 0, 0)
+        size = settings.TILE_SIZE
+
+        # render bottom walls
+        for row, col in zip(*np.nonzero(grid & MazeGenerator.DIRECTION.HORIZONTAL.value)):
+            x, y = int(col) * size, int(row) * size
+            pygame.draw.line(surface, color, (x, y + size), (x + size, y + size))
+
+        # render right walls
+        for row, col in zip(*np.nonzero(grid & MazeGenerator.DIRECTION.VERTICAL.value)):
+            x, y = int(col) * size, int(row) * size
+            pygame.draw.line(surface, color, (x + size, y), (x + size, y + size))
+
+register(
+    id="FrozenLake-v3",
+    entry_point="frozen_lake:FrozenLake"
+)
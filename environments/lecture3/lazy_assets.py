@@ -0,0 +1,74 @@
+"""
+Assets loaded on first use
+"""
+from collections.abc import Mapping
+from typing import Callable, Dict
+
+import pygame
+
+
+class LazyAssets(Mapping):
+    """
+    Mapping of asset names to loaders, an asset is loaded on first access and kept.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable]) -> None:
+        self.loaders = loaders
+        self.loaded = {}
+
+    def preload(self) -> None:
+        for name in self.loaders:
+            self[name]
+
+    def __getitem__(self, name):
+        if name not in self.loaded:
+            self.loaded[name] = self.loaders[name]()
+        return self.loaded[name]
+
+    def __iter__(self):
+        return iter(self.loaders)
+
+    def __len__(self) -> int:
+        return len(self.loaders)
+
+
+def image(path) -> Callable:
+    return lambda: pygame.image.load(path)
+
+
+def images(*paths) -> Callable:
+    return lambda: [pygame.image.load(path) for path in paths]
+
+
+def sound(path) -> Callable:
+    def load():
+        init_mixer()
+        return pygame.mixer.Sound(path)
+
+    return load
+
+
+def font(path, size: int) -> Callable:
+    def load():
+        pygame.font.init()
+        return pygame.font.Font(path, size)
+
+    return load
+
+
+def init_mixer() -> None:
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
+
+def play_music(path, loops: int = -1) -> None:
+    init_mixer()
+    pygame.mixer.music.load(path)
+    pygame.mixer.music.play(loops=loops)
+
+
+def stop_music() -> None:
+    # nothing to stop when the mixer was never needed
+    if pygame.mixer.get_init():
+        pygame.mixer.music.stop()
+        pygame.mixer.quit()
@@ -1,13 +1,9 @@
-from gym.envs.registration import register
 import gym
 
+# registers FrozenLake-v3
+import frozen_lake
 from agent import MonteCarlo
 
-register(
-    id="FrozenLake-v3",
-    entry_point="frozen_lake:FrozenLake"
-)
-
 def train(env, agent, episodes):
     for episode in range(episodes):
         print(episode)
@@ -0,0 +1,217 @@
+"""
+Seeded Frozen Lake levels generated in parallel and stored in one memory-mapped file
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional, Type
+import multiprocessing
+import os
+
+import numpy as np
+
+import maze_generators
+import settings
+from mdp import CompiledMDP, map_records
+
+
+class Level(NamedTuple):
+    seed: int
+    rows: int
+    cols: int
+    grid: np.ndarray
+    adjacency: np.ndarray
+    component_labels: np.ndarray
+    initial_state: int
+    finish_state: int
+    hole_mask: np.ndarray
+    goal_distances: np.ndarray
+    goal_parents: np.ndarray
+    mdp: CompiledMDP
+
+
+class MazeCorpus:
+    """
+    Levels of the same size written by build_corpus, indexed without reading the file.
+
+    The file is a run of .npy records: a header (count, rows, cols, actions)
+    and then one array per field of FIELDS, whose first axis is the level.
+    A level is a set of views into the mapped records, so indexing is O(1).
+    """
+
+    FIELDS = (
+        "seeds",
+        "initial_states",
+        "finish_states",
+        "grids",
+        "adjacency",
+        "component_labels",
+        "hole_masks",
+        "goal_distances",
+        "goal_parents",
+        "next_states",
+        "rewards",
+        "terminals",
+    )
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        arrays = map_records(self.path, "r")
+        self.count, self.rows, self.cols, self.actions = (int(n) for n in arrays[0])
+        for name, array in zip(self.FIELDS, arrays[1:]):
+            setattr(self, name, array)
+
+        # every (state, action) pair of a lake has a single outcome
+        pairs = self.rows * self.cols * self.actions
+        self.offsets = np.arange(pairs + 1, dtype=np.int64)
+        self.probabilities = np.ones(pairs, dtype=np.float64)
+
+    @staticmethod
+    def fields(count: int, rows: int, cols: int, actions: int):
+        # (name, shape, dtype) of every record after the header
+        tiles, pairs = rows * cols, rows * cols * actions
+        shapes = {
+            "seeds": ((count,), np.int64),
+            "initial_states": ((count,), np.int64),
+            "finish_states": ((count,), np.int64),
+            "grids": ((count, rows, cols), np.uint8),
+            "adjacency": ((count, tiles), np.uint8),
+            "component_labels": ((count, tiles), np.int64),
+            "hole_masks": ((count, tiles), bool),
+            "goal_distances": ((count, tiles), np.int64),
+            "goal_parents": ((count, tiles), np.int64),
+            "next_states": ((count, pairs), np.int64),
+            "rewards": ((count, pairs), np.float64),
+            "terminals": ((count, pairs), bool),
+        }
+        return [(name, *shapes[name]) for name in MazeCorpus.FIELDS]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> Level:
+        if not -self.count <= index < self.count:
+            raise IndexError("level {} out of a corpus of {}".format(index, self.count))
+        index %= self.count
+        tiles = self.rows * self.cols
+        return Level(
+            int(self.seeds[index]),
+            self.rows,
+            self.cols,
+            self.grids[index],
+            self.adjacency[index],
+            self.component_labels[index],
+            int(self.initial_states[index]),
+            int(self.finish_states[index]),
+            self.hole_masks[index],
+            self.goal_distances[index],
+            self.goal_parents[index],
+            CompiledMDP(
+                tiles,
+                self.actions,
+                self.offsets,
+                self.probabilities,
+                self.next_states[index],
+                self.rewards[index],
+                self.terminals[index],
+            ),
+        )
+
+
+@lru_cache(maxsize=None)
+def _open_corpus(path: Path, mtime: int) -> MazeCorpus:
+    # mtime only takes part in the cache key, a rebuilt corpus is mapped again
+    return MazeCorpus(path)
+
+
+def load_corpus(path: Path) -> MazeCorpus:
+    return _open_corpus(Path(path), os.stat(path).st_mtime_ns)
+
+
+def build_corpus(
+    path: Path,
+    count: int,
+    rows: int,
+    cols: int,
+    seed: int = 0,
+    maze_generator_class: Type = maze_generators.RecursiveDivisionMazeGenerator,
+    workers: Optional[int] = None,
+) -> MazeCorpus:
+    """
+    Generates count lakes across a process pool and stores them at path.
+
+    Level i is FrozenLake(rows=rows, cols=cols, seed=seeds[i]) for seeds drawn
+    from seed, so the corpus is the same for any number of workers.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    actions = settings.NUM_ACTIONS
+    seeds = np.random.SeedSequence(seed).generate_state(count).astype(np.int64)
+
+    # lay out the records first, the workers then fill their levels in place
+    tmp = path.with_name("{}.{}.tmp".format(path.name, os.getpid()))
+    with open(tmp, "wb") as f:
+        np.lib.format.write_array(f, np.array([count, rows, cols, actions], dtype=np.int64))
+        for _, shape, dtype in MazeCorpus.fields(count, rows, cols, actions):
+            header = {
+                "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                "fortran_order": False,
+                "shape": shape,
+            }
+            np.lib.format.write_array_header_1_0(f, header)
+            f.seek(int(np.prod(shape)) * np.dtype(dtype).itemsize, os.SEEK_CUR)
+        f.truncate()
+
+    try:
+        jobs = [(index, int(level_seed)) for index, level_seed in enumerate(seeds)]
+        initargs = (tmp, rows, cols, maze_generator_class)
+        if workers == 1:
+            _attach_corpus(*initargs)
+            for job in jobs:
+                _write_level(job)
+        else:
+            with multiprocessing.Pool(workers, _attach_corpus, initargs) as pool:
+                for _ in pool.imap_unordered(_write_level, jobs, chunksize=max(1, count // 64)):
+                    pass
+        os.replace(tmp, path)
+    finally:
+        _records.clear()
+        if tmp.exists():
+            tmp.unlink()
+    return load_corpus(path)
+
+
+# Records of the corpus being written and the lake parameters, per worker process
+_records = {}
+_lake = {}
+
+
+def _attach_corpus(path: Path, rows: int, cols: int, maze_generator_class: Type) -> None:
+    _records.clear()
+    _records.update(zip(MazeCorpus.FIELDS, map_records(path, "r+")[1:]))
+    _lake.update(rows=rows, cols=cols, maze_generator_class=maze_generator_class)
+
+
+def _write_level(job) -> None:
+    # imported here, frozen_lake loads its levels from this module
+    from frozen_lake import FrozenLake
+
+    index, seed = job
+    lake = FrozenLake(seed=seed, lazy=True, **_lake)
+    mdp = lake.compile_P()
+    level = {
+        "seeds": seed,
+        "initial_states": lake.initial_state,
+        "finish_states": lake.finish_state,
+        "grids": lake.grid,
+        "adjacency": lake.adjacency,
+        "component_labels": lake.component_labels,
+        "hole_masks": lake.hole_mask,
+        "goal_distances": lake.goal_distances,
+        "goal_parents": lake.goal_parents,
+        "next_states": mdp.next_states,
+        "rewards": mdp.rewards,
+        "terminals": mdp.terminals,
+    }
+    for name, value in level.items():
+        _records[name][index] = value
+
@@ -0,0 +1,94 @@
+"""
+Maze generator based on Eller's algorithm
+"""
+from pathlib import Path
+from typing import Dict, Iterator, List
+import random
+
+import numpy as np
+
+from .MazeGenerator import MazeGenerator
+
+
+class EllerMazeGenerator(MazeGenerator):
+    """
+    Builds the maze one row at a time, only the regions of the current row
+    are remembered, so rows can be streamed for mazes of any height.
+
+    Every row randomly joins neighbors of different regions, then sends at
+    least one cell of each region down to the next row. The last row joins
+    whatever is still apart.
+    """
+
+    def generate(self, start: int = 0) -> None:
+        # the only method that needs the whole grid, iter_rows() and save() stream it
+        grid = self.grid
+        for i, row in enumerate(self.iter_rows()):
+            grid[i] = row
+
+    def iter_rows(self) -> Iterator[np.ndarray]:
+        """
+        Yields the uint8 wall bits of every row, top to bottom, in O(cols) memory.
+        """
+        cols = self.num_cols
+        horizontal, vertical = self.DIRECTION.HORIZONTAL.value, self.DIRECTION.VERTICAL.value
+        rand = random.random
+
+        # region of every cell of the row, and the cells of every region
+        regions = list(range(cols))
+        members: Dict[int, List[int]] = {col: [col] for col in range(cols)}
+        next_region = cols
+
+        for row in range(self.num_rows):
+            last = (row == self.num_rows - 1)
+            walls = bytearray(cols)
+
+            for col in range(cols - 1):
+                a, b = regions[col], regions[col + 1]
+                if (a == b or not (last or rand() < 0.5)):
+                    walls[col] |= vertical
+                    continue
+                # relabel the smaller region into the larger one
+                if (len(members[a]) < len(members[b])):
+                    a, b = b, a
+                for cell in members[b]:
+                    regions[cell] = a
+                members[a].extend(members.pop(b))
+
+            if (last):
+                yield np.frombuffer(bytes(walls), dtype=np.uint8)
+                return
+
+            # every region goes on down through at least one of its cells
+            down = bytearray(cols)
+            for cells in members.values():
+                chosen = [cell for cell in cells if rand() < 0.5]
+                if (len(chosen) == 0):
+                    chosen = [cells[int(rand() * len(cells))]]
+                for cell in chosen:
+                    down[cell] = 1
+
+            # cells with a wall above them start regions of their own
+            members = {}
+            for col in range(cols):
+                if (not down[col]):
+                    walls[col] |= horizontal
+                    regions[col] = next_region
+                    next_region += 1
+                members.setdefault(regions[col], []).append(col)
+
+            yield np.frombuffer(bytes(walls), dtype=np.uint8)
+
+    def save(self, path: Path) -> None:
+        """
+        Streams the maze into a .npy file row by row, np.load(path, mmap_mode="r") maps it back.
+        """
+        with open(path, "wb") as f:
+            header = {
+                "descr": np.lib.format.dtype_to_descr(np.dtype(np.uint8)),
+                "fortran_order": False,
+                "shape": (self.num_rows, self.num_cols),
+            }
+            np.lib.format.write_array_header_2_0(f, header)
+            for row in self.iter_rows():
+                f.write(row.tobytes())
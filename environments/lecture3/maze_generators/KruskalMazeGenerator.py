@@ -0,0 +1,54 @@
+"""
+Maze generator based on Kruskal's algorithm
+"""
+import numpy as np
+
+from .MazeGenerator import MazeGenerator
+
+
+class KruskalMazeGenerator(MazeGenerator):
+    """
+    Opens the inner walls in a random order whenever they separate two
+    different regions, which are tracked with a union-find over the cells.
+
+    Walls are kept as two arrays of cell pairs and the result is written into
+    a uint8 wall grid at once, the same format the other generators produce.
+    """
+
+    def generate(self, start: int = 0) -> None:
+        rows, cols = self.num_rows, self.num_cols
+        cells = np.arange(rows * cols, dtype=np.int64).reshape(rows, cols)
+
+        # the wall below a cell, then the one on its right, each between two cells
+        below = cells[:-1, :].ravel()
+        right = cells[:, :-1].ravel()
+        first = np.concatenate([below, right])
+        second = np.concatenate([below + cols, right + 1])
+
+        order = np.random.permutation(len(first))
+        opened = np.zeros(len(first), dtype=bool)
+
+        # Plain lists are much cheaper than NumPy scalar access in this loop
+        parent = list(range(rows * cols))
+        remaining = rows * cols - 1
+        for edge, a, b in zip(order.tolist(), first[order].tolist(), second[order].tolist()):
+            # find both roots, halving the paths on the way
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            while parent[b] != b:
+                parent[b] = parent[parent[b]]
+                b = parent[b]
+            if a == b:
+                continue
+
+            parent[a] = b
+            opened[edge] = True
+            remaining -= 1
+            if remaining == 0:
+                break
+
+        grid = self._init_walls().reshape(-1)
+        grid[below[opened[:len(below)]]] &= ~np.uint8(self.DIRECTION.HORIZONTAL.value)
+        grid[right[opened[len(below):]]] &= ~np.uint8(self.DIRECTION.VERTICAL.value)
+        self.grid = grid.reshape(rows, cols)
@@ -1,10 +1,20 @@
 """
 Base for any maze generator
 """
-from typing import List, Any, Tuple, Set, NoReturn
+from typing import List, Any, Optional, Tuple, NoReturn
+from enum import Enum
+
+import numpy as np
 
 
 class MazeGenerator:
+
+    # Wall bits of a grid cell: HORIZONTAL is the wall below it, VERTICAL the one on its right
+    DIRECTION = Enum('Direction', ['HORIZONTAL', 'VERTICAL'])
+    # the same bits as plain ints, Enum.value is slow in the carving loops
+    HORIZONTAL_BIT = DIRECTION.HORIZONTAL.value
+    VERTICAL_BIT = DIRECTION.VERTICAL.value
+
     def __init__(
         self,
         num_rows: int,
@@ -14,14 +24,81 @@ class MazeGenerator:
         self.num_rows = num_rows
         self.num_cols = num_cols
         self.neighborhood = neighborhood
-        self.walls: Set[Tuple[int, int]] = set()
-        self.grid: List[List[int]] = [ [0 for _ in range(self.num_cols)] for _ in range(self.num_rows) ]
+        # allocated on first use, a generator that streams its rows never needs it
+        self._grid: Optional[np.ndarray] = None
+
+    @property
+    def grid(self) -> np.ndarray:
+        if self._grid is None:
+            self._grid = self._empty_grid()
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid: np.ndarray) -> None:
+        self._grid = grid
+
+    def _empty_grid(self) -> np.ndarray:
+        # uint8 grid of wall bits, every generator fills it in place or replaces it
+        return np.zeros((self.num_rows, self.num_cols), dtype=np.uint8)
+
+    def _init_walls(self) -> np.ndarray:
+        # every cell has the wall below it and the one on its right, except on the border
+        horizontal, vertical = self.DIRECTION.HORIZONTAL.value, self.DIRECTION.VERTICAL.value
+        walls = np.full((self.num_rows, self.num_cols), horizontal | vertical, dtype=np.uint8)
+        walls[-1, :] &= ~np.uint8(horizontal)
+        walls[:, -1] &= ~np.uint8(vertical)
+        return walls
+
+    def _padded_walls(self) -> Tuple[bytearray, bytearray]:
+        # Cells of a grid padded with one blocked cell on every side, so a
+        # neighbor is a plain index offset with no border test: the initial
+        # wall bits and the blocked flags, cell (i, j) at (i + 1) * (cols + 2) + j + 1.
+        # Plain bytearray indexing is much cheaper than NumPy scalar access.
+        padded = np.zeros((self.num_rows + 2, self.num_cols + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = self._init_walls()
+        walls = bytearray(padded.tobytes())
+        padded[:] = 1
+        padded[1:-1, 1:-1] = 0
+        return walls, bytearray(padded.tobytes())
+
+    def _remove_wall(self, walls: bytearray, cell: int, neighbor: int) -> None:
+        # the wall between two padded cells belongs to the upper or left one
+        difference = neighbor - cell
+        if difference == 1:
+            walls[cell] &= ~self.VERTICAL_BIT
+        elif difference == -1:
+            walls[neighbor] &= ~self.VERTICAL_BIT
+        elif difference > 0:
+            walls[cell] &= ~self.HORIZONTAL_BIT
+        else:
+            walls[neighbor] &= ~self.HORIZONTAL_BIT
+
+    def _unpad_walls(self, walls: bytearray) -> np.ndarray:
+        grid = np.frombuffer(walls, dtype=np.uint8).reshape(self.num_rows + 2, self.num_cols + 2)
+        return np.ascontiguousarray(grid[1:-1, 1:-1])
     
-    def get_grid(self) -> List[List[int]]:
+    def get_grid(self) -> np.ndarray:
         return self.grid
 
     def generate(self, start: int = 0) -> NoReturn:
         raise NotImplementedError()
 
-    def render(self) -> NoReturn:
-        raise NotImplementedError()
+    def render(self) -> None:
+        # draws the uint8 grid of wall bits
+        horizontal = (self.grid & self.DIRECTION.HORIZONTAL.value) != 0
+        vertical = (self.grid & self.DIRECTION.VERTICAL.value) != 0
+        horizontal[-1, :] = True
+
+        # render the top wall
+        lines = ["-" * int(self.num_cols * 2 + 1)]
+
+        for i in range(self.num_rows):
+            # every row starts with a left wall, then a right wall per cell when it exists
+            cells = "".join(" |" if wall else "  " for wall in vertical[i, :-1])
+            lines.append("|" + cells + " |")
+
+            # corners are always drawn, then the bottom wall of every cell
+            bottoms = "".join("-" if wall else " " for wall in horizontal[i])
+            lines.append("-" + "-".join(bottoms) + "-")
+
+        print("\n".join(lines))
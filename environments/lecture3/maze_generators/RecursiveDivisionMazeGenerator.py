@@ -1,12 +1,11 @@
 from typing import List, Any, Tuple, Set, NoReturn
-from enum import Enum
 import random
 
+import numpy as np
+
 from .MazeGenerator import MazeGenerator
 
 class RecursiveDivisionMazeGenerator(MazeGenerator):
-    
-    DIRECTION = Enum('Direction', ['HORIZONTAL', 'VERTICAL'])
 
     def __init__(self,
         num_rows: int,
@@ -16,55 +15,65 @@ class RecursiveDivisionMazeGenerator(MazeGenerator):
         super().__init__(num_rows, num_cols, neighborhood)
 
     def generate(self, start: int = 0) -> None:
-        self.__divide(0, 0, self.num_cols, self.num_rows, self.__choose_direction(self.num_cols, self.num_rows))
-    
-    def __choose_direction(self, width: int, height: int) -> DIRECTION:
+        # Walls are collected as (first cell, length, passage) segments and drawn
+        # into the grid at once, most regions are tiny and per region NumPy
+        # calls would cost more than the division itself.
+        walls = {self.DIRECTION.HORIZONTAL: ([], [], []), self.DIRECTION.VERTICAL: ([], [], [])}
+        rand = random.random
+
+        # Regions still to divide, the first subfield is pushed last so it is
+        # divided first, in the same order the recursive version used.
+        stack: List[Tuple[int, int, int, int]] = [(0, 0, self.num_cols, self.num_rows)]
+
+        while len(stack) > 0:
+            x, y, width, height = stack.pop()
+            if (width < 2 or height < 2):
+                continue
+
+            direction = self.__choose_direction(width, height)
+            starts, lengths, passages = walls[direction]
+
+            if (direction == self.DIRECTION.HORIZONTAL):
+                # wall below row wy, with a passage at column px
+                wy = y + int(rand() * (height - 1))
+                px = x + int(rand() * width)
+                starts.append(wy * self.num_cols + x)
+                lengths.append(width)
+                passages.append(wy * self.num_cols + px)
+
+                stack.append((x, wy + 1, width, y + height - wy - 1))
+                stack.append((x, y, width, wy - y + 1))
+            else:
+                # wall right of column wx, with a passage at row py
+                wx = x + int(rand() * (width - 1))
+                py = y + int(rand() * height)
+                starts.append(y * self.num_cols + wx)
+                lengths.append(height)
+                passages.append(py * self.num_cols + wx)
+
+                stack.append((wx + 1, y, x + width - wx - 1, height))
+                stack.append((x, y, wx - x + 1, height))
+
+        grid = self.grid.reshape(-1)
+        for direction, (starts, lengths, passages) in walls.items():
+            if len(starts) == 0:
+                continue
+            # horizontal walls run along a row, vertical ones down a column
+            step = 1 if (direction == self.DIRECTION.HORIZONTAL) else self.num_cols
+            lengths = np.array(lengths, dtype=np.int64)
+            first = np.repeat(np.array(starts, dtype=np.int64), lengths)
+            along = np.arange(len(first), dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            grid[first + along * step] |= direction.value
+            grid[np.array(passages, dtype=np.int64)] &= ~np.uint8(direction.value)
+
+    def __choose_direction(self, width: int, height: int) -> MazeGenerator.DIRECTION:
         if (width < height):
             return self.DIRECTION.HORIZONTAL
         elif (height < width):
             return self.DIRECTION.VERTICAL
         else:
-            num = random.random() * 100
-            return self.DIRECTION.HORIZONTAL if (num % 2 == 0) else self.DIRECTION.VERTICAL
-
-    def __divide(self, x: int, y: int, width: int, height: int, direction: DIRECTION) -> None:
-        if (width < 2 or height < 2):
-            return
-        
-        horizontal = (direction == self.DIRECTION.HORIZONTAL)
-
-        # where will the wall be drawn from?
-        wx = x + (0 if horizontal else random.randint(0, width - 2))
-        wy = y + (random.randint(0, height - 2) if horizontal else 0)
-
-        # where will the passage through the wall exist?
-        px = wx + (random.randint(0, width) if horizontal else 0)
-        py = wy + (0 if horizontal else random.randint(0, width))
-
-        # how long will the wall be?
-        length = width if horizontal else height
-
-        # what direction will the wall be drawn?
-        dx = 1 if horizontal else 0
-        dy = 0 if horizontal else 1
-
-        # draw the wall
-        for _ in range(length):
-            self.grid[wy][wx] |= direction.value if (wx != px or wy != py) else 0
-            wx += dx
-            wy += dy
-
-        # determine the bounds of the subfields
-        nx, ny = x, y
-        w, h = (width, (wy - y + 1)) if horizontal else ((wx - x + 1), height)
-
-        self.__divide(nx, ny, w, h, self.__choose_direction(w, h))
-
-        nx, ny = (x, (wy + 1)) if horizontal else ((wx + 1), y)
-        w, h = (width, (y + height - wy - 1)) if horizontal else ((x + width - wx - 1), height)
-        
-        self.__divide(nx, ny, w, h, self.__choose_direction(w, h))
-    
+            return self.DIRECTION.HORIZONTAL if (random.random() < 0.5) else self.DIRECTION.VERTICAL
+
     def render(self) -> None :
         print(" " + "_" * (self.num_cols * 2 - 1))
         for row in range(self.num_rows):
@@ -0,0 +1,71 @@
+"""
+Maze generator based on Wilson's algorithm
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+from .MazeGenerator import MazeGenerator
+
+
+class WilsonMazeGenerator(MazeGenerator):
+    """
+    Grows the maze from the start cell with loop-erased random walks, so every
+    spanning tree of the grid is drawn with the same probability.
+
+    A walk remembers the last exit taken from every cell, following the exits
+    from where it started is then the walk with its loops erased.
+    """
+
+    # directions drawn from NumPy at once, a walk takes them one by one
+    DRAWS = 1 << 16
+
+    def __init__(
+        self,
+        num_rows: int,
+        num_cols: int,
+        neighborhood: List[Tuple[int, int]] = [(0, -1), (1, 0), (0, 1), (-1, 0)],
+    ) -> None:
+        for offset_i, offset_j in neighborhood:
+            if abs(offset_i) + abs(offset_j) != 1:
+                raise ValueError("walls can only separate orthogonal neighbors")
+        super().__init__(num_rows, num_cols, neighborhood)
+
+    def generate(self, start: int = 0) -> None:
+        cols = self.num_cols
+
+        walls, blocked = self._padded_walls()
+        width = cols + 2
+        inner = np.flatnonzero(np.frombuffer(blocked, dtype=np.uint8) == 0).tolist()
+        remove_wall = self._remove_wall
+
+        offsets = [offset_i * width + offset_j for offset_i, offset_j in self.neighborhood]
+        in_tree = bytearray(len(walls))
+        exits = [0] * len(walls)
+        in_tree[(start // cols + 1) * width + start % cols + 1] = 1
+
+        draws: List[int] = []
+        for origin in inner:
+            if in_tree[origin]:
+                continue
+
+            # random walk until the tree is hit, blocked cells are drawn again
+            current_index = origin
+            while not in_tree[current_index]:
+                if len(draws) == 0:
+                    draws = np.random.randint(0, len(offsets), size=self.DRAWS).tolist()
+                neighbor = current_index + offsets[draws.pop()]
+                if blocked[neighbor]:
+                    continue
+                exits[current_index] = neighbor
+                current_index = neighbor
+
+            # add the loop-erased walk to the tree, opening the walls along it
+            current_index = origin
+            while not in_tree[current_index]:
+                in_tree[current_index] = 1
+                neighbor = exits[current_index]
+                remove_wall(walls, current_index, neighbor)
+                current_index = neighbor
+
+        self.grid = self._unpad_walls(walls)
@@ -1,4 +1,13 @@
 from maze_generators.DepthFirstMazeGenerator import DepthFirstMazeGenerator
+from maze_generators.EllerMazeGenerator import EllerMazeGenerator
+from maze_generators.KruskalMazeGenerator import KruskalMazeGenerator
 from maze_generators.RecursiveDivisionMazeGenerator import RecursiveDivisionMazeGenerator
+from maze_generators.WilsonMazeGenerator import WilsonMazeGenerator
 
-(DepthFirstMazeGenerator, RecursiveDivisionMazeGenerator)
+(
+    DepthFirstMazeGenerator,
+    EllerMazeGenerator,
+    KruskalMazeGenerator,
+    RecursiveDivisionMazeGenerator,
+    WilsonMazeGenerator,
+)
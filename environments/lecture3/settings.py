@@ -1,11 +1,6 @@
-import os
 import pathlib
 
-import pygame
-
-# Allowing environment to have sounds
-if "SDL_AUDIODRIVER" in os.environ:
-    del os.environ["SDL_AUDIODRIVER"]
+from lazy_assets import LazyAssets, image, images, sound
 
 # Size of the square tiles used in this environment.
 TILE_SIZE = 32
@@ -35,36 +30,27 @@ DEFAULT_DELAY = 1.0
 
 BASE_DIR = pathlib.Path(__file__).parent
 
-# Textures used in the environment
-TEXTURES = {
-    "ice": pygame.image.load(BASE_DIR / "assets" / "graphics" / "ice.png"),
-    "hole": pygame.image.load(BASE_DIR / "assets" / "graphics" / "hole.png"),
-    "cracked_hole": pygame.image.load(
-        BASE_DIR / "assets" / "graphics" / "cracked_hole.png"
+# Textures used in the environment, loaded on first use
+TEXTURES = LazyAssets({
+    "ice": image(BASE_DIR / "assets" / "graphics" / "ice.png"),
+    "hole": image(BASE_DIR / "assets" / "graphics" / "hole.png"),
+    "cracked_hole": image(BASE_DIR / "assets" / "graphics" / "cracked_hole.png"),
+    "goal": image(BASE_DIR / "assets" / "graphics" / "goal.png"),
+    "stool": image(BASE_DIR / "assets" / "graphics" / "stool.png"),
+    "character": images(
+        BASE_DIR / "assets" / "graphics" / "elf_left.png",
+        BASE_DIR / "assets" / "graphics" / "elf_down.png",
+        BASE_DIR / "assets" / "graphics" / "elf_right.png",
+        BASE_DIR / "assets" / "graphics" / "elf_up.png",
     ),
-    "goal": pygame.image.load(BASE_DIR / "assets" / "graphics" / "goal.png"),
-    "stool": pygame.image.load(BASE_DIR / "assets" / "graphics" / "stool.png"),
-    "character": [
-        pygame.image.load(BASE_DIR / "assets" / "graphics" / "elf_left.png"),
-        pygame.image.load(BASE_DIR / "assets" / "graphics" / "elf_down.png"),
-        pygame.image.load(BASE_DIR / "assets" / "graphics" / "elf_right.png"),
-        pygame.image.load(BASE_DIR / "assets" / "graphics" / "elf_up.png"),
-    ],
-}
-
-# Initializing the mixer
-pygame.mixer.init()
+})
 
-# Loading music
-pygame.mixer.music.load(BASE_DIR / "assets" / "sounds" / "ice_village.ogg")
+# Music, the mixer is only initialized when it starts playing
+MUSIC = BASE_DIR / "assets" / "sounds" / "ice_village.ogg"
 
 # Sound effects
-SOUNDS = {
-    "ice_cracking": pygame.mixer.Sound(
-        BASE_DIR / "assets" / "sounds" / "ice_cracking.ogg"
-    ),
-    "water_splash": pygame.mixer.Sound(
-        BASE_DIR / "assets" / "sounds" / "water_splash.ogg"
-    ),
-    "win": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "win.ogg"),
-}
\ No newline at end of file
+SOUNDS = LazyAssets({
+    "ice_cracking": sound(BASE_DIR / "assets" / "sounds" / "ice_cracking.ogg"),
+    "water_splash": sound(BASE_DIR / "assets" / "sounds" / "water_splash.ogg"),
+    "win": sound(BASE_DIR / "assets" / "sounds" / "win.ogg"),
+})
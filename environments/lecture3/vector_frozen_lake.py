@@ -0,0 +1,158 @@
+"""
+Headless Frozen Lake stepping N agents in lockstep over compiled transition tables
+"""
+from typing import Iterator, List, Optional, Tuple
+
+import gym
+import gym.vector
+import numpy as np
+
+from frozen_lake import FrozenLake
+
+
+class VectorFrozenLake(gym.vector.VectorEnv):
+    """
+    N Frozen Lake episodes held as NumPy state arrays.
+
+    With shared_maze=True every environment runs on the same maze, otherwise
+    each one gets its own maze of the same size. A seed kwarg is spread over
+    the mazes, each one is generated from its own child seed. Finished episodes are reset
+    to their initial state on the same step, the observation that ended them
+    is reported in infos["final_observation"].
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        shared_maze: bool = True,
+        max_episode_steps: Optional[int] = None,
+        **kwargs
+    ):
+        kwargs["lazy"] = False
+        kwargs["render_mode"] = None
+        mazes_n = 1 if shared_maze else num_envs
+        seed = kwargs.pop("seed", None)
+        if seed is None or mazes_n == 1:
+            seeds = [seed] * mazes_n
+        else:
+            # one independent seed per maze, the same seed always gives the same mazes
+            seeds = [
+                int(child.generate_state(1)[0])
+                for child in np.random.SeedSequence(seed).spawn(mazes_n)
+            ]
+        self.lakes = [FrozenLake(seed=maze_seed, **kwargs) for maze_seed in seeds]
+
+        lake = self.lakes[0]
+        self.NUM_TILES = lake.NUM_TILES
+        self.NUM_ACTIONS = lake.NUM_ACTIONS
+        self.max_episode_steps = max_episode_steps
+        super().__init__(
+            num_envs,
+            gym.spaces.Discrete(self.NUM_TILES),
+            gym.spaces.Discrete(self.NUM_ACTIONS),
+        )
+
+        # one row of (state, action) pairs per maze, every pair has a single outcome
+        self.next_states = np.stack([self.__table(l, "next_states") for l in self.lakes])
+        self.rewards = np.stack([self.__table(l, "rewards") for l in self.lakes])
+        self.terminals = np.stack([self.__table(l, "terminals") for l in self.lakes])
+        self.initial_states = np.array(
+            [l.initial_state for l in self.lakes], dtype=np.int64
+        )
+
+        # maze used by every environment
+        self.mazes = np.arange(num_envs, dtype=np.int64) % len(self.lakes)
+        self.current_states = self.initial_states[self.mazes].copy()
+        self.episode_lengths = np.zeros(num_envs, dtype=np.int64)
+        self.np_random = np.random.default_rng()
+
+    def reset(self, *, seed=None, options=None):
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        self.current_states = self.initial_states[self.mazes].copy()
+        self.episode_lengths[:] = 0
+        return self.current_states.copy(), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        pairs = self.current_states * self.NUM_ACTIONS + actions
+        to_states = self.next_states[self.mazes, pairs]
+        rewards = self.rewards[self.mazes, pairs]
+        terminated = self.terminals[self.mazes, pairs]
+
+        self.episode_lengths += 1
+        if self.max_episode_steps is None:
+            truncated = np.zeros(self.num_envs, dtype=bool)
+        else:
+            truncated = ~terminated & (self.episode_lengths >= self.max_episode_steps)
+
+        done = terminated | truncated
+        self.current_states = np.where(done, self.initial_states[self.mazes], to_states)
+        self.episode_lengths[done] = 0
+
+        infos = {"final_observation": to_states, "_final_observation": done}
+        return self.current_states.copy(), rewards, terminated, truncated, infos
+
+    def sample_actions(self, pi: np.ndarray) -> np.ndarray:
+        """
+        Draws one action per environment from the stochastic policy pi[state, action].
+        """
+        cdf = np.cumsum(pi[self.current_states], axis=1)
+        u = self.np_random.random(self.num_envs)[:, None] * cdf[:, -1:]
+        return np.minimum((u >= cdf).sum(axis=1), self.NUM_ACTIONS - 1)
+
+    def rollout(self, pi: np.ndarray, steps: int) -> Tuple[np.ndarray, ...]:
+        """
+        Runs every environment for the given number of steps under pi.
+
+        Returns (states, actions, rewards, terminated, truncated) arrays of shape
+        (steps, num_envs).
+        """
+        states = np.empty((steps, self.num_envs), dtype=np.int64)
+        actions = np.empty((steps, self.num_envs), dtype=np.int64)
+        rewards = np.empty((steps, self.num_envs), dtype=np.float64)
+        terminated = np.empty((steps, self.num_envs), dtype=bool)
+        truncated = np.empty((steps, self.num_envs), dtype=bool)
+        for t in range(steps):
+            states[t] = self.current_states
+            actions[t] = self.sample_actions(pi)
+            _, rewards[t], terminated[t], truncated[t], _ = self.step(actions[t])
+        return states, actions, rewards, terminated, truncated
+
+    @staticmethod
+    def episodes(
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        terminated: np.ndarray,
+        truncated: np.ndarray,
+    ) -> Iterator[List[Tuple[int, int, float, bool]]]:
+        """
+        Splits a rollout into the finished episodes of every environment.
+
+        Each episode is a list of (state, action, reward, terminated) steps, the
+        same sequence MonteCarlo.update expects. An episode cut by the time limit
+        ends on a step that is not terminated. Unfinished tails are dropped.
+        """
+        for env in range(states.shape[1]):
+            ends = np.flatnonzero(terminated[:, env] | truncated[:, env])
+            begin = 0
+            for end in ends:
+                yield [
+                    (
+                        int(states[t, env]),
+                        int(actions[t, env]),
+                        float(rewards[t, env]),
+                        t == end and bool(terminated[t, env]),
+                    )
+                    for t in range(begin, end + 1)
+                ]
+                begin = end + 1
+
+    def close_extras(self, **kwargs):
+        self.lakes = []
+
+    @staticmethod
+    def __table(lake: FrozenLake, name: str) -> np.ndarray:
+        P = lake.P
+        return np.asarray(getattr(P, name))[P.offsets[:-1]]
@@ -1,5 +1,6 @@
 import pygame
 
+from . import lazy_assets
 from . import settings
 from .tilemap import TileMap
 
@@ -8,7 +9,7 @@ class World:
     def __init__(self, title, state, action):
         pygame.init()
         pygame.display.init()
-        pygame.mixer.music.play(loops=-1)
+        lazy_assets.play_music(settings.MUSIC)
         self.render_surface = pygame.Surface(
             (settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT)
         )
@@ -94,7 +95,6 @@ class World:
         pygame.display.update()
 
     def close(self):
-        pygame.mixer.music.stop()
-        pygame.mixer.quit()
+        lazy_assets.stop_music()
         pygame.display.quit()
         pygame.quit()
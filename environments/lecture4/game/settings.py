@@ -1,8 +1,7 @@
 from pathlib import Path
 
-import pygame
-
 from game.src.frames import generate_frames
+from game.src.lazy_assets import LazyAssets, image
 
 TILE_SIZE = 16
 PLAYER_WIDTH = 16
@@ -14,19 +13,24 @@ BASE_DIR = Path(__file__).parent
 
 ENVIRONMENT = BASE_DIR / "env.txt"
 
-# Graphics
-GAME_TEXTURES = {
-    "background": pygame.image.load(BASE_DIR / "graphics" / "background.png"),
-    "tiles": pygame.image.load(BASE_DIR / "graphics" / "sheet.png"),
-    "main_character": pygame.image.load(BASE_DIR / "graphics" / "main_character.png"),
-    "statues": pygame.image.load(BASE_DIR / "graphics" / "statues.png"),
-}
+# Compiled transition models, keyed by the content they were built from
+CACHE_DIR = BASE_DIR.parent / ".cache"
+
+# Graphics, loaded on first use
+GAME_TEXTURES = LazyAssets({
+    "background": image(BASE_DIR / "graphics" / "background.png"),
+    "tiles": image(BASE_DIR / "graphics" / "sheet.png"),
+    "main_character": image(BASE_DIR / "graphics" / "main_character.png"),
+    "statues": image(BASE_DIR / "graphics" / "statues.png"),
+})
 
 # Frames
-GAME_FRAMES = {
-    "tiles": generate_frames(GAME_TEXTURES["tiles"], TILE_SIZE, TILE_SIZE),
-    "main_character": generate_frames(
+GAME_FRAMES = LazyAssets({
+    "tiles": lambda: generate_frames(GAME_TEXTURES["tiles"], TILE_SIZE, TILE_SIZE),
+    "main_character": lambda: generate_frames(
         GAME_TEXTURES["main_character"], PLAYER_WIDTH, PLAYER_HEIGHT
     ),
-    "statues": generate_frames(GAME_TEXTURES["statues"], STATUE_WIDTH, STATUE_HEIGHT),
-}
+    "statues": lambda: generate_frames(
+        GAME_TEXTURES["statues"], STATUE_WIDTH, STATUE_HEIGHT
+    ),
+})
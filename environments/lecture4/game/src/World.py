@@ -1,3 +1,8 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Tuple
+
 from .. import settings
 
 from game.src.Tilemap import Tile, TileMap
@@ -7,68 +12,108 @@ from game.src.Statue import Statue
 TILES = {"0": {"frame": 41}, "1": {"frame": 46}, "2": {"frame": 44}}
 
 
+class Level(NamedTuple):
+    """
+    Immutable parsed form of a level file.
+    """
+
+    rows: int
+    cols: int
+    map: Tuple[Tuple[int, ...], ...]
+    main_character: Tuple[int, int]
+    statue_1: Tuple[int, int]
+    statue_2: Tuple[int, int]
+    target_1: Tuple[int, int]
+    target_2: Tuple[int, int]
+
+
+@lru_cache(maxsize=None)
+def _parse_level(path: Path, mtime: int) -> Level:
+    # mtime only takes part in the cache key, an edited file is parsed again
+    with open(path, "r") as f:
+        rows, cols = (int(n) for n in f.readline().split(" "))
+        tile_map = tuple(
+            tuple(int(s) for s in f.readline().rstrip("\n").split(" ")[:cols])
+            for _ in range(rows)
+        )
+        positions = [
+            tuple(int(n) for n in f.readline().split(" ")) for _ in range(5)
+        ]
+    return Level(rows, cols, tile_map, *positions)
+
+
+def load_level(path: Path) -> Level:
+    return _parse_level(Path(path), os.stat(path).st_mtime_ns)
+
+
 class World:
     def __init__(self):
+        self.level = load_level(settings.ENVIRONMENT)
         self.tile_map = None
         self.main_character = None
         self.statue_1 = None
         self.statue_2 = None
-        self.target_1 = None
-        self.target_2 = None
+        self.target_1 = self.level.target_1
+        self.target_2 = self.level.target_2
         self.__load_environment()
 
     def __load_environment(self) -> None:
-        with open(settings.ENVIRONMENT, "r") as f:
-            rows, cols = f.readline().split(" ")
-            rows, cols = int(rows), int(cols)
-            self.tile_map = TileMap(rows, cols)
-
-            for i in range(rows):
-                row = f.readline()
-                if row[-1] == "\n":
-                    row = row[:-1]
-                row = row.split(" ")
-
-                for j in range(cols):
-                    tile_def = TILES[row[j]]
-                    x, y = TileMap.to_screen(i, j)
-                    self.tile_map.tiles[i][j] = Tile(x, y, tile_def["frame"])
-                    self.tile_map.map[i][j] = int(row[j])
-
-            row, col = f.readline().split(" ")
-            row, col = int(row), int(col)
-            x, y = TileMap.to_screen(row, col)
-            self.main_character = MainCharacter(x, y, self)
-            self.tile_map.tiles[row][col].busy_by = "MC"
-
-            row, col = f.readline().split(" ")
-            row, col = int(row), int(col)
-            x, y = TileMap.to_screen(row, col)
-            self.statue_1 = Statue(x, y, self, "backward")
-            self.tile_map.tiles[row][col].busy_by = "ST"
-
-            row, col = f.readline().split(" ")
-            row, col = int(row), int(col)
-            x, y = TileMap.to_screen(row, col)
-            self.statue_2 = Statue(x, y, self, "forward")
-            self.tile_map.tiles[row][col].busy_by = "ST"
-
-            row, col = f.readline().split(" ")
-            self.target_1 = int(row), int(col)
-
-            row, col = f.readline().split(" ")
-            self.target_2 = int(row), int(col)
+        level = self.level
+        self.tile_map = TileMap(level.rows, level.cols)
+
+        for i in range(level.rows):
+            for j in range(level.cols):
+                tile_def = TILES[str(level.map[i][j])]
+                x, y = TileMap.to_screen(i, j)
+                self.tile_map.tiles[i][j] = Tile(x, y, tile_def["frame"])
+                self.tile_map.map[i][j] = level.map[i][j]
+
+        self.main_character = MainCharacter(0, 0, self)
+        self.statue_1 = Statue(0, 0, self, "backward")
+        self.statue_2 = Statue(0, 0, self, "forward")
+        self.__restore()
+
+    def __restore(self) -> None:
+        # Only the entities and the occupancy marks change during an episode,
+        # put them back where the level places them
+        for tile_row in self.tile_map.tiles:
+            for tile in tile_row:
+                tile.busy_by = None
+
+        for entity, position in (
+            (self.main_character, self.level.main_character),
+            (self.statue_1, self.level.statue_1),
+            (self.statue_2, self.level.statue_2),
+        ):
+            entity.x, entity.y = TileMap.to_screen(*position)
+            entity.off_set_i = entity.off_set_j = 0
+            self.tile_map.tiles[position[0]][position[1]].busy_by = entity.busy_mark
+
+        self.main_character.frame_index = 1
+        self.statue_1.frame_index = int(self.statue_1.movement_direction == "backward")
+        self.statue_2.frame_index = int(self.statue_2.movement_direction == "backward")
 
     def reset(self):
-        self.tile_map = None
-        self.main_character = None
-        self.statue_1 = None
-        self.statue_2 = None
-        self.target_1 = None
-        self.target_2 = None
-        self.__load_environment()
+        self.__restore()
         return self.get_state()
 
+    def set_state(self, state, frame_index=1):
+        # Moves the entities onto the (mc, s1, s2) cells of get_state(), only the
+        # tiles they leave and the ones they enter are marked again
+        entities = (self.main_character, self.statue_1, self.statue_2)
+        for entity in entities:
+            i, j = TileMap.to_map(entity.x, entity.y)
+            if self.tile_map.tiles[i][j].busy_by == entity.busy_mark:
+                self.tile_map.tiles[i][j].busy_by = None
+
+        for entity, cell in zip(entities, state):
+            i, j = divmod(cell, self.tile_map.cols)
+            entity.x, entity.y = TileMap.to_screen(i, j)
+            entity.off_set_i = entity.off_set_j = 0
+            self.tile_map.tiles[i][j].busy_by = entity.busy_mark
+
+        self.main_character.frame_index = frame_index
+
     def check_lost(self) -> None:
         return (
             self.main_character.x == self.statue_1.x
@@ -5,12 +5,8 @@ import gym
 # from agent import QLearning
 from agent import ValueIteration, PolicyIteration
 
-from gym.envs.registration import register
-
-register(
-    id="Princess-v0",
-    entry_point="princess:PrincessEnv"
-)
+# registers Princess-v0
+import princess
 
 # RobotBattery-v0, Taxi-v3, FrozenLake-v1, RobotMaze-v0
 ENVIRONMENT = "Princess-v0"
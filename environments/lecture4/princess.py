@@ -1,4 +1,5 @@
 import time
+from typing import NamedTuple, Tuple
 
 import numpy as np
 
@@ -6,13 +7,30 @@ import pygame
 
 import gym
 from gym import spaces
+from gym.envs.registration import register
 
 from game.Game import Game
+from game import settings
+from mdp import CompiledMDP, LazyP
+
+
+class PrincessSnapshot(NamedTuple):
+    """
+    Immutable state of a PrincessEnv, taken by clone_state().
+    """
+
+    state: Tuple[int, int, int]
+    action: int
+    reward: float
+    frame_index: int
 
 
 class PrincessEnv(gym.Env):
     metadata = {"render_modes": ["human"], "render_fps": 4}
 
+    # bump when __build_P changes, models stored by an older builder are then rebuilt
+    MODEL_VERSION = 1
+
     def __init__(self, **kwargs):
         super().__init__()
         self.render_mode = kwargs.get("render_mode")
@@ -21,28 +39,164 @@ class PrincessEnv(gym.Env):
         self.observation_space = spaces.Discrete(self.n * self.n * self.n)
         self.action_space = spaces.Discrete(4)
         self.current_state = self.game.get_state()
+        self.initial_state = self.current_state
         self.current_action = 0
         self.current_reward = 0.0
         self.delay = 1
-        self.__build_P()
+        self.lazy = kwargs.get("lazy", False)
+        # compact mode only numbers the states reachable from the initial one
+        self.compact = kwargs.get("compact", False)
+        if self.lazy:
+            if self.compact:
+                raise ValueError("compact mode needs the whole transition model")
+            # transitions are only simulated for the (state, action) pairs the agent
+            # visits, the absorbing ones are found on the first of them
+            self.absorbing = None
+            self.P = LazyP(self.observation_space.n, self.action_space.n, self.__transitions)
+        else:
+            self.__load_P()
+        if self.compact:
+            self.P, self.decode, self.encode = self.P.compact(
+                self.__compute_state_result(*self.current_state)
+            )
+            self.observation_space = spaces.Discrete(len(self.decode))
+        # the model is deterministic, a step is one lookup in its outcome table
+        self.steps = None if self.lazy else self.P.outcomes
+
+    def __load_P(self):
+        # the transition model only depends on the level, reuse it across constructions
+        with open(settings.ENVIRONMENT, "rb") as f:
+            key = CompiledMDP.cache_key(self.MODEL_VERSION, f.read())
+        self.P = CompiledMDP.cached(
+            settings.CACHE_DIR / "princess-{}.mdp".format(key), self.__build_P
+        )
 
     def __build_P(self):
-        self.P = { state : { action: [] for action in range(self.action_space.n) } for state in range(self.observation_space.n) } 
-        self.terminal_state = None
-        # simulate the game
-        # (state, action) => (state', Reward)
-        # s2 follows mc, s1 reflects mc
+        # Same transitions as the step by step simulation in test_princess.py,
+        # computed for every state at once: states are decoded into (row, col)
+        # arrays and the moves of the main character and both statues are
+        # resolved with boolean masks.
+        tile_map = self.game.world.tile_map
+        rows, cols = tile_map.rows, tile_map.cols
+        walkable = np.array(tile_map.map) != 0
+        target_1 = self.__get_state(*self.game.world.target_1)
+        target_2 = self.__get_state(*self.game.world.target_2)
+        offsets = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+        states = np.arange(self.observation_space.n, dtype=np.int64)
+        mc, s1, s2 = states // self.n**2, states // self.n % self.n, states % self.n
+
+        def move(cell, di, dj, *blockers):
+            i, j = cell // cols + di, cell % cols + dj
+            inside = (0 <= i) & (i < rows) & (0 <= j) & (j < cols)
+            ok = inside & walkable[np.clip(i, 0, rows - 1), np.clip(j, 0, cols - 1)]
+            to_cell = i * cols + j
+            for blocker in blockers:
+                ok &= to_cell != blocker
+            return np.where(ok, to_cell, cell)
+
+        next_states = np.empty((len(states), self.action_space.n), dtype=np.int64)
+        rewards = np.empty((len(states), self.action_space.n), dtype=np.float64)
+        terminals = np.empty((len(states), self.action_space.n), dtype=bool)
+        wins = np.empty((len(states), self.action_space.n), dtype=bool)
+        for action, (di, dj) in enumerate(offsets):
+            # s2 follows mc, s1 reflects mc
+            mc_to = move(mc, di, dj, s1, s2)
+            s1_to = move(s1, -di, -dj, s2)
+            s2_to = move(s2, di, dj, s1_to)
+            collision = s1_to == s2_to
+            s1_to = np.where(collision, s1, s1_to)
+            s2_to = np.where(collision, s2, s2_to)
+
+            to_states = self.__compute_state_result(mc_to, s1_to, s2_to)
+            lost = (mc_to == s1_to) | (mc_to == s2_to)
+            win = ~lost & (
+                ((s1_to == target_1) & (s2_to == target_2))
+                | ((s2_to == target_1) & (s1_to == target_2))
+            )
+            next_states[:, action] = to_states
+            rewards[:, action] = np.select(
+                [lost, win, states == to_states], [-100.0, 1000.0, -10.0], -1.0
+            )
+            terminals[:, action] = lost | win
+            wins[:, action] = win
+
+        next_states, rewards, terminals = next_states.ravel(), rewards.ravel(), terminals.ravel()
+
+        actions_n = self.action_space.n
+        wins = np.flatnonzero(wins)
+        absorbing = np.zeros(len(next_states), dtype=bool)
+        absorbing[self.__absorbing_pairs(wins.tolist(), next_states[wins].tolist())] = True
+        owners = np.repeat(states, actions_n)
+        next_states[absorbing] = owners[absorbing]
+        rewards[absorbing] = 0.0
+        terminals[absorbing] = True
+
+        return CompiledMDP(
+            self.observation_space.n,
+            actions_n,
+            np.arange(len(next_states) + 1, dtype=np.int64),
+            np.ones(len(next_states), dtype=np.float64),
+            next_states,
+            rewards,
+            terminals,
+        )
+
+    def __absorbing_pairs(self, wins, destinations):
+        # The sequential builder turns a state into an absorbing one while it equals
+        # the destination of the last win found so far, walk the wins in that order.
+        # wins are the (state, action) pair indices that win, in increasing order.
+        actions_n = self.action_space.n
+        pairs_n = self.observation_space.n * actions_n
+        absorbing = []
+        terminal_state, start = None, 0
+        for k, destination in zip(wins + [pairs_n], destinations + [None]):
+            if terminal_state is not None:
+                begin = max(start, terminal_state * actions_n)
+                end = min(k, (terminal_state + 1) * actions_n)
+                absorbing.extend(range(begin, end))
+                if begin <= k < (terminal_state + 1) * actions_n:
+                    # the win itself is never simulated, the terminal state stays
+                    absorbing.append(k)
+                    start = k + 1
+                    continue
+            if k < pairs_n:
+                terminal_state, start = destination, k + 1
+        return absorbing
+
+    def __lazy_absorbing(self):
+        # A win moves both statues onto the targets, so before it each statue is
+        # on a target or next to one. Only those states are simulated to find
+        # every win, then the wins are walked like in __build_P.
+        rows, cols = self.game.world.tile_map.rows, self.game.world.tile_map.cols
+        near = sorted({
+            self.__get_state(i + di, j + dj)
+            for i, j in (self.game.world.target_1, self.game.world.target_2)
+            for di, dj in [(0, 0), (0, -1), (1, 0), (0, 1), (-1, 0)]
+            if 0 <= i + di < rows and 0 <= j + dj < cols
+        })
+        wins = []
         for mc in range(self.n):
-            for s1 in range(self.n):
-                for s2 in range(self.n):                                                               
+            for s1 in near:
+                for s2 in near:
+                    state = self.__compute_state_result(mc, s1, s2)
                     for action in range(self.action_space.n):
-                        state = self.__compute_state_result(mc, s1, s2)
-                        if (state == self.terminal_state):
-                            self.P[state][action].append((1.0, state, 0.0, True))
-                        else:
-                            to_state, reward, terminated = self.__simulate_step(mc, s1, s2, action)
-                            self.P[state][action].append((1.0, to_state, reward, terminated))
-    
+                        to_state, reward, _ = self.__simulate_step(mc, s1, s2, action)
+                        if reward == 1000.0:
+                            wins.append((state * self.action_space.n + action, to_state))
+        wins.sort()
+        return set(self.__absorbing_pairs([k for k, _ in wins], [to for _, to in wins]))
+
+    def __transitions(self, state: int, action: int):
+        # Lazy counterpart of __build_P, with the same absorbing pairs
+        if self.absorbing is None:
+            self.absorbing = self.__lazy_absorbing()
+        if state * self.action_space.n + action in self.absorbing:
+            return [(1.0, state, 0.0, True)]
+        mc, s1, s2 = state // self.n**2, state // self.n % self.n, state % self.n
+        to_state, reward, terminated = self.__simulate_step(mc, s1, s2, action)
+        return [(1.0, to_state, reward, terminated)]
+
     def __simulate_step(self, mc: int, s1: int, s2: int, action: int):
         state = self.__compute_state_result(mc, s1, s2)
         mc_from = self.__get_coordinates(mc)
@@ -151,6 +305,21 @@ class PrincessEnv(gym.Env):
     def __compute_state_result(self, mc, s1, s2):
         return mc * self.n**2 + s1 * self.n + s2
 
+    def __observation(self, state):
+        observation = self.__compute_state_result(*state)
+        return int(self.encode[observation]) if self.compact else observation
+
+    def __state(self, observation):
+        state = int(self.decode[observation]) if self.compact else observation
+        mc, rest = divmod(state, self.n**2)
+        return (mc, *divmod(rest, self.n))
+
+    def __model_step(self, observation, action):
+        if self.steps is None:
+            _, to_state, reward, terminated = self.P.transitions(observation, action)[0]
+            return to_state, reward, terminated
+        return self.steps[observation * self.action_space.n + action]
+
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
 
@@ -159,55 +328,65 @@ class PrincessEnv(gym.Env):
                 raise RuntimeError("Variable options is not a dictionary")
             self.delay = options.get("delay", 0.5)
 
-        np.random.seed(seed)
-
-        self.current_state = self.game.reset()
+        # without rendering the level objects are never moved, there is nothing to reload
+        if self.render_mode is not None:
+            self.game.reset()
+        self.current_state = self.initial_state
         self.current_action = 0
         self.current_reward = 0
 
-        return self.__compute_state_result(*self.current_state), {}
+        return self.__observation(self.current_state), {}
 
     def step(self, action):
         self.current_action = action
 
-        old_state = self.current_state
-        self.current_state = self.game.update(self.current_action)
-
-        terminated = False
-        self.current_reward = -1.0
-        
-        if old_state == self.current_state:
-            self.current_reward = -10.0
-        elif self.game.world.check_lost():
-            terminated = True
-            self.current_reward = -100.0
-        elif self.game.world.check_win():
-            terminated = True
-            self.current_reward = 1000.0
+        # the puzzle is advanced on the encoded state only, through the transition model
+        to_state, reward, terminated = self.__model_step(
+            self.__observation(self.current_state), action
+        )
+        self.current_state = self.__state(to_state)
+        self.current_reward = reward
 
         if self.render_mode is not None:
+            # the level objects are only moved to draw them
+            game_state = self.game.update(action)
+            assert game_state == self.current_state
             self.render()
             time.sleep(self.delay)
 
-        _, to_state , reward, terminated2 = self.P[self.__compute_state_result(*old_state)][action][0]
-
-        assert to_state == self.__compute_state_result(*self.current_state)
-        assert reward == self.current_reward
-        assert terminated == terminated2
-
-        return (
-            # self.__compute_state_result(*self.current_state),
-            to_state,
-            # self.current_reward,
-            reward,
-            # terminated,
-            terminated2,
-            False,
-            {},
+        return to_state, reward, terminated, False, {}
+
+    def clone_state(self):
+        """
+        Captures the puzzle where it stands, restore_state() comes back to it.
+        """
+        return PrincessSnapshot(
+            self.current_state,
+            self.current_action,
+            self.current_reward,
+            self.game.world.main_character.frame_index,
         )
 
+    def restore_state(self, snapshot):
+        """
+        Puts the puzzle back as it was when snapshot was taken, in O(1).
+        """
+        self.current_state = snapshot.state
+        self.current_action = snapshot.action
+        self.current_reward = snapshot.reward
+        # without rendering the level objects are never moved, there is nothing to put back
+        if self.render_mode is not None:
+            self.game.world.set_state(snapshot.state, snapshot.frame_index)
+        return self.__observation(self.current_state)
+
     def render(self):
         self.game.render()
 
     def close(self):
         self.game.close()
+
+
+register(
+    id="Princess-v0",
+    entry_point="princess:PrincessEnv"
+)
@@ -0,0 +1,88 @@
+"""
+PrincessEnv transition model against the step by step simulation it replaced
+"""
+import numpy as np
+
+from mdp import CompiledMDP
+from princess import PrincessEnv
+
+OFFSETS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+
+def simulate_P(env):
+    # The sequential builder: every (mc, s1, s2, action) simulated in turn. A
+    # state equal to the destination of the last win found so far is absorbing.
+    world = env.game.world
+    rows, cols = world.tile_map.rows, world.tile_map.cols
+    n = env.n
+
+    def free(i, j, *blockers):
+        return (
+            0 <= i < rows
+            and 0 <= j < cols
+            and (i, j) not in blockers
+            and world.tile_map.map[i][j] != 0
+        )
+
+    def step(mc, s1, s2, action):
+        di, dj = OFFSETS[action]
+        mc_from, s1_from, s2_from = divmod(mc, cols), divmod(s1, cols), divmod(s2, cols)
+
+        # s2 follows mc, s1 reflects mc
+        to = (mc_from[0] + di, mc_from[1] + dj)
+        mc_to = to if free(*to, s1_from, s2_from) else mc_from
+        to = (s1_from[0] - di, s1_from[1] - dj)
+        s1_to = to if free(*to, s2_from) else s1_from
+        to = (s2_from[0] + di, s2_from[1] + dj)
+        s2_to = to if free(*to, s1_to) else s2_from
+        if s1_to == s2_to:
+            s1_to, s2_to = s1_from, s2_from
+
+        to_state = (
+            (mc_to[0] * cols + mc_to[1]) * n * n
+            + (s1_to[0] * cols + s1_to[1]) * n
+            + s2_to[0] * cols + s2_to[1]
+        )
+        if mc_to in (s1_to, s2_to):
+            return to_state, -100.0, True, False
+        if (s1_to, s2_to) in (
+            (world.target_1, world.target_2),
+            (world.target_2, world.target_1),
+        ):
+            return to_state, 1000.0, True, True
+        if to_state == mc * n * n + s1 * n + s2:
+            return to_state, -10.0, False, False
+        return to_state, -1.0, False, False
+
+    P = {}
+    terminal_state = None
+    for mc in range(n):
+        for s1 in range(n):
+            for s2 in range(n):
+                state = mc * n * n + s1 * n + s2
+                P[state] = {}
+                for action in range(env.action_space.n):
+                    if state == terminal_state:
+                        P[state][action] = [(1.0, state, 0.0, True)]
+                        continue
+                    to_state, reward, terminated, win = step(mc, s1, s2, action)
+                    if win:
+                        terminal_state = to_state
+                    P[state][action] = [(1.0, to_state, reward, terminated)]
+    return P
+
+
+def test_compiled_model_matches_simulation():
+    env = PrincessEnv()
+    reference = CompiledMDP.from_P(simulate_P(env), env.observation_space.n, env.action_space.n)
+    for name in CompiledMDP.FIELDS:
+        assert np.array_equal(getattr(env.P, name), getattr(reference, name)), name
+
+
+
+def test_lazy_model_matches_compiled_model():
+    env = PrincessEnv()
+    lazy = PrincessEnv(lazy=True)
+    for state in range(env.observation_space.n):
+        for action in range(env.action_space.n):
+            assert lazy.P[state][action] == env.P[state][action], (state, action)
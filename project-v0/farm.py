@@ -1,23 +1,52 @@
 import time
+from typing import NamedTuple, Tuple
 
 import numpy as np
 
 import gym
 from gym import spaces
+from gym.envs.registration import register
 
 from game.Game import Game
+from game import settings
+from mdp import CompiledMDP
+
+
+class FarmSnapshot(NamedTuple):
+    """
+    Immutable state of a FarmEnv, taken by clone_state().
+    """
+
+    state: Tuple[int, int, int, int]
+    action: int
+    reward: float
+    frame_index: int
 
 
 class FarmEnv(gym.Env):
     metadata = {"render_modes": ["human"], "render_fps": 4}
 
+    # bump when __build_P changes, models stored by an older builder are then rebuilt
+    MODEL_VERSION = 1
+
     def __init__(self, **kwargs):
         super().__init__()
         self.render_mode = kwargs.get("render_mode")
         self.game = Game("Farm Puzzle Env", self.render_mode)
-        self.mc_n = self.game.scene.tile_map.rows * self.game.scene.tile_map.cols
-        self.b1_n = 24
-        self.b2_n = 23
+        tile_map = self.game.scene.tile_map
+        self.rows, self.cols = tile_map.rows, tile_map.cols
+        self.mc_n = self.rows * self.cols
+        # boxes only ever rest on ice, they are numbered among the ice cells
+        self.ice = [
+            i * self.cols + j
+            for i in range(self.rows)
+            for j in range(self.cols)
+            if tile_map.map[i][j] == "I"
+        ]
+        self.ice_index = np.full(self.mc_n, -1, dtype=np.int64)
+        self.ice_index[self.ice] = np.arange(len(self.ice))
+        self.b1_n = len(self.ice)
+        self.b2_n = len(self.ice)
         self.num_directions = 4
         self.observation_space = spaces.Discrete(
             self.mc_n * self.b1_n * self.b2_n * self.num_directions
@@ -27,15 +56,113 @@ class FarmEnv(gym.Env):
         self.current_action = 0
         self.current_reward = 0.0
         self.delay = 1
+        self.__load_P()
+        # compact mode only numbers the states reachable from the initial one
+        self.compact = kwargs.get("compact", False)
+        if self.compact:
+            self.P, self.decode, self.encode = self.P.compact(
+                self.__compute_state_result(*self.current_state)
+            )
+            self.observation_space = spaces.Discrete(len(self.decode))
+
+    def __load_P(self):
+        # the transition model only depends on the level, reuse it across constructions
+        with open(settings.ENVIRONMENT, "rb") as f:
+            key = CompiledMDP.cache_key(self.MODEL_VERSION, f.read())
+        self.P = CompiledMDP.cached(
+            settings.CACHE_DIR / "farm-{}.mdp".format(key), self.__build_P
+        )
+
+    def __build_P(self):
+        # Same transitions as Scene.apply_action, computed for every state at once.
+        # States that already have a box on the target are absorbing.
+        tile_map = self.game.scene.tile_map
+        ice = np.array(self.ice, dtype=np.int64)
+        offsets = np.array(self.game.scene.push_directions, dtype=np.int64)
+        target = self.game.scene.target[0] * self.cols + self.game.scene.target[1]
+
+        # number of ice cells a box slides over from every cell in every direction
+        is_ice = np.array(tile_map.map) == "I"
+        slide = np.zeros((self.mc_n, self.num_directions), dtype=np.int64)
+        for d, (di, dj) in enumerate(offsets):
+            for cell in range(self.mc_n):
+                i, j = cell // self.cols + di, cell % self.cols + dj
+                while 0 <= i < self.rows and 0 <= j < self.cols and is_ice[i, j]:
+                    slide[cell, d] += 1
+                    i, j = i + di, j + dj
+
+        states = np.arange(self.observation_space.n, dtype=np.int64)
+        boxes_n = self.b1_n * self.b2_n
+        d = states // (self.mc_n * boxes_n)
+        mc = states // boxes_n % self.mc_n
+        b1 = ice[states // self.b2_n % self.b1_n]
+        b2 = ice[states % self.b2_n]
+
+        def neighbor(cell, di, dj):
+            i, j = cell // self.cols + di, cell % self.cols + dj
+            inside = (0 <= i) & (i < self.rows) & (0 <= j) & (j < self.cols)
+            return inside, i * self.cols + j
+
+        def push(box, other, d):
+            # the box stops before the other box when it lies on the slide
+            di, dj = offsets[d, 0], offsets[d, 1]
+            delta_i = other // self.cols - box // self.cols
+            delta_j = other % self.cols - box % self.cols
+            distance = np.abs(delta_i) + np.abs(delta_j)
+            aligned = (delta_i * dj == delta_j * di) & (delta_i * di + delta_j * dj > 0)
+            steps = slide[box, d]
+            steps = np.where(aligned & (distance <= steps), distance - 1, steps)
+            return box + steps * (di * self.cols + dj)
+
+        next_states = np.empty((len(states), self.action_space.n), dtype=np.int64)
+        for action in range(self.action_space.n):
+            if action < self.num_directions:
+                to_d = np.full_like(d, action)
+                inside, to_cell = neighbor(mc, *offsets[action])
+                free = inside & (to_cell != b1) & (to_cell != b2)
+                to_mc, to_b1, to_b2 = np.where(free, to_cell, mc), b1, b2
+            else:
+                to_d, to_mc = d, mc
+                inside, to_cell = neighbor(mc, offsets[d, 0], offsets[d, 1])
+                hit_1 = inside & (to_cell == b1)
+                hit_2 = inside & ~hit_1 & (to_cell == b2)
+                to_b1 = np.where(hit_1, push(b1, b2, d), b1)
+                to_b2 = np.where(hit_2, push(b2, b1, d), b2)
+            next_states[:, action] = self.__compute_state_result(to_d, to_mc, to_b1, to_b2)
+
+        won = (b1 == target) | (b2 == target)
+        terminals = (next_states // self.b2_n % self.b1_n == self.ice_index[target]) | (
+            next_states % self.b2_n == self.ice_index[target]
+        )
+        rewards = np.select(
+            [next_states == states[:, None], terminals], [-10.0, 0.0], -1.0
+        )
+        next_states[won] = states[won, None]
+        rewards[won] = 0.0
+        terminals[won] = True
+
+        return CompiledMDP(
+            self.observation_space.n,
+            self.action_space.n,
+            np.arange(next_states.size + 1, dtype=np.int64),
+            np.ones(next_states.size, dtype=np.float64),
+            next_states.ravel(),
+            rewards.ravel(),
+            terminals.ravel(),
+        )
 
     def __compute_state_result(self, d, mc, s1, s2):
         return (
             d * self.mc_n * self.b1_n * self.b2_n
             + mc * self.b1_n * self.b2_n
-            + s1 * self.b2_n
-            + s2
+            + self.ice_index[s1] * self.b2_n
+            + self.ice_index[s2]
         )
 
+    def __observation(self, state):
+        observation = int(self.__compute_state_result(*state))
+        return int(self.encode[observation]) if self.compact else observation
+
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
 
@@ -44,13 +171,11 @@ class FarmEnv(gym.Env):
                 raise RuntimeError("Variable options is not a dictionary")
             self.delay = options.get("delay", 0.5)
 
-        np.random.seed(seed)
-
         self.current_state = self.game.reset()
         self.current_action = 0
         self.current_reward = 0
 
-        return self.__compute_state_result(*self.current_state), {}
+        return self.__observation(self.current_state), {}
 
     def step(self, action):
         self.current_action = action
@@ -72,15 +197,42 @@ class FarmEnv(gym.Env):
         truncated = self.current_state[3] == 12 or self.current_state[3] == 12
 
         return (
-            self.__compute_state_result(*self.current_state),
+            self.__observation(self.current_state),
             self.current_reward,
             terminated,
             truncated,
             {},
         )
 
+    def clone_state(self):
+        """
+        Captures the puzzle where it stands, restore_state() comes back to it.
+        """
+        return FarmSnapshot(
+            self.current_state,
+            self.current_action,
+            self.current_reward,
+            self.game.scene.character.frame_index,
+        )
+
+    def restore_state(self, snapshot):
+        """
+        Puts the puzzle back as it was when snapshot was taken, in O(1).
+        """
+        self.current_state = snapshot.state
+        self.current_action = snapshot.action
+        self.current_reward = snapshot.reward
+        self.game.scene.set_state(snapshot.state, snapshot.frame_index)
+        return self.__observation(self.current_state)
+
     def render(self):
         self.game.render()
 
     def close(self):
         self.game.close()
+
+
+register(
+    id="farm-v0",
+    entry_point="farm:FarmEnv"
+)
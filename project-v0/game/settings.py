@@ -1,8 +1,7 @@
 from pathlib import Path
 
-import pygame
-
 from .src.frames import generate_frames
+from .src.lazy_assets import LazyAssets, image
 
 TILE_SIZE = 16
 PLAYER_WIDTH = 16
@@ -12,25 +11,28 @@ BASE_DIR = Path(__file__).parent
 
 ENVIRONMENT = BASE_DIR / "env.txt"
 
-# Graphics
-GAME_TEXTURES = {
-    # "ice": pygame.image.load(BASE_DIR / "graphics" / "ice.png"),
-    # "snow": pygame.image.load(BASE_DIR / "graphics" / "snow.png"),
-    # "box": pygame.image.load(BASE_DIR / "graphics" / "box.png"),
-    # "character": pygame.image.load(BASE_DIR / "graphics" / "character.png"),
-    # "switch": pygame.image.load(BASE_DIR / "graphics" / "switch.png"),
-    "sheet": pygame.image.load(BASE_DIR / "graphics" / "sheet.png")
-}
+# Compiled transition models, keyed by the content they were built from
+CACHE_DIR = BASE_DIR.parent / ".cache"
+
+# Graphics, loaded on first use
+GAME_TEXTURES = LazyAssets({
+    # "ice": image(BASE_DIR / "graphics" / "ice.png"),
+    # "snow": image(BASE_DIR / "graphics" / "snow.png"),
+    # "box": image(BASE_DIR / "graphics" / "box.png"),
+    # "character": image(BASE_DIR / "graphics" / "character.png"),
+    # "switch": image(BASE_DIR / "graphics" / "switch.png"),
+    "sheet": image(BASE_DIR / "graphics" / "sheet.png")
+})
 
 # Frames
-GAME_FRAMES = {
-    # "ice": [pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)],
-    # "snow": [pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)],
-    # "box": [pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)],
-    # "character": generate_frames(
+GAME_FRAMES = LazyAssets({
+    # "ice": lambda: [pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)],
+    # "snow": lambda: [pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)],
+    # "box": lambda: [pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)],
+    # "character": lambda: generate_frames(
     #     GAME_TEXTURES["character"], PLAYER_WIDTH, PLAYER_HEIGHT
     # ),
-    "sheet": generate_frames(
+    "sheet": lambda: generate_frames(
         GAME_TEXTURES["sheet"], TILE_SIZE, TILE_SIZE
     )
-}
+})
@@ -1,3 +1,8 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Tuple
+
 from .. import settings
 
 from .Box import Box
@@ -5,13 +10,46 @@ from .Character import Character
 from .Tilemap import Tile, TileMap, TILE_TEXTURE_DEF
 
 
+class Level(NamedTuple):
+    """
+    Immutable parsed form of a level file.
+    """
+
+    rows: int
+    cols: int
+    map: Tuple[Tuple[str, ...], ...]
+    character: Tuple[int, int]
+    box1: Tuple[int, int]
+    box2: Tuple[int, int]
+    target: Tuple[int, int]
+
+
+@lru_cache(maxsize=None)
+def _parse_level(path: Path, mtime: int) -> Level:
+    # mtime only takes part in the cache key, an edited file is parsed again
+    with open(path, "r") as f:
+        rows, cols = (int(n) for n in f.readline().split(" "))
+        tile_map = tuple(
+            tuple(f.readline().rstrip("\n").split(" ")) for _ in range(rows)
+        )
+        positions = [
+            tuple(int(n) for n in f.readline().split(" ")) for _ in range(4)
+        ]
+    return Level(rows, cols, tile_map, *positions)
+
+
+def load_level(path: Path) -> Level:
+    return _parse_level(Path(path), os.stat(path).st_mtime_ns)
+
+
 class Scene:
     def __init__(self):
+        self.level = load_level(settings.ENVIRONMENT)
         self.tile_map = None
         self.character = None
         self.box1 = None
         self.box2 = None
-        self.target = None
+        self.target = self.level.target
         self.__load_environment()
 
         self.actions_map = [
@@ -24,51 +62,56 @@ class Scene:
         self.push_directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
 
     def __load_environment(self) -> None:
-        with open(settings.ENVIRONMENT, "r") as f:
-            rows, cols = f.readline().split(" ")
-            rows, cols = int(rows), int(cols)
-            self.tile_map = TileMap(rows, cols)
-
-            for i in range(rows):
-                row = f.readline()
-                if row[-1] == "\n":
-                    row = row[:-1]
-                row = row.split(" ")
-
-                for j, s in enumerate(row):
-                    x, y = TileMap.to_screen(i, j)
-                    self.tile_map.tiles[i][j] = Tile(x, y, TILE_TEXTURE_DEF[s], 0)
-                    self.tile_map.map[i][j] = s
-
-            row, col = f.readline().split(" ")
-            row, col = int(row), int(col)
-            x, y = TileMap.to_screen(row, col)
-            self.character = Character(x, y, self)
-
-            row, col = f.readline().split(" ")
-            row, col = int(row), int(col)
-            x, y = TileMap.to_screen(row, col)
-            self.box1 = Box(x, y, self)
-            self.tile_map.tiles[row][col].busy = True
-
-            row, col = f.readline().split(" ")
-            row, col = int(row), int(col)
-            x, y = TileMap.to_screen(row, col)
-            self.box2 = Box(x, y, self)
+        level = self.level
+        self.tile_map = TileMap(level.rows, level.cols)
+
+        for i, row in enumerate(level.map):
+            for j, s in enumerate(row):
+                x, y = TileMap.to_screen(i, j)
+                self.tile_map.tiles[i][j] = Tile(x, y, TILE_TEXTURE_DEF[s], 0)
+                self.tile_map.map[i][j] = s
+
+        self.character = Character(0, 0, self)
+        self.box1 = Box(0, 0, self)
+        self.box2 = Box(0, 0, self)
+        self.__restore()
+
+    def __restore(self) -> None:
+        # Only the entities and the occupancy flags change during an episode,
+        # put them back where the level places them
+        for tile_row in self.tile_map.tiles:
+            for tile in tile_row:
+                tile.busy = False
+
+        self.character.x, self.character.y = TileMap.to_screen(*self.level.character)
+        self.character.direction = 3
+        self.character.frame_index = 1
+
+        for box, (row, col) in ((self.box1, self.level.box1), (self.box2, self.level.box2)):
+            box.x, box.y = TileMap.to_screen(row, col)
             self.tile_map.tiles[row][col].busy = True
 
-            row, col = f.readline().split(" ")
-            self.target = int(row), int(col)
-
     def reset(self):
-        self.tile_map = None
-        self.character = None
-        self.box1 = None
-        self.box2 = None
-        self.target = None
-        self.__load_environment()
+        self.__restore()
         return self.get_state()
 
+    def set_state(self, state, frame_index=1):
+        # Moves the entities onto the (d, mc, b1, b2) state of get_state(), only
+        # the tiles the boxes leave and the ones they enter are flagged again
+        direction, mc, b1, b2 = state
+        for box in (self.box1, self.box2):
+            i, j = TileMap.to_map(box.x, box.y)
+            self.tile_map.tiles[i][j].busy = False
+
+        for box, cell in ((self.box1, b1), (self.box2, b2)):
+            i, j = divmod(cell, self.tile_map.cols)
+            box.x, box.y = TileMap.to_screen(i, j)
+            self.tile_map.tiles[i][j].busy = True
+
+        self.character.x, self.character.y = TileMap.to_screen(*divmod(mc, self.tile_map.cols))
+        self.character.direction = direction
+        self.character.frame_index = frame_index
+
     def get_state(self):
         mc_i, mc_j = TileMap.to_map(self.character.x, self.character.y)
         mc_d = self.character.direction
@@ -1,15 +1,10 @@
 import sys
 import gym
 
-from gym.envs.registration import register
-
+# registers farm-v0
+import farm
 from agent import DynaQ, DynaQPlus
 
-register(
-    id="farm-v0",
-    entry_point="farm:FarmEnv"
-)
-
 def run(env, agent, selection_method, episodes, planning_steps):
     for episode in range(episodes):
         if episode > 0:
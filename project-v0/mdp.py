@@ -0,0 +1,358 @@
+"""
+Compiled, array-backed transition model
+"""
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import cached_property
+from pathlib import Path
+from typing import Callable, List, Tuple
+import hashlib
+import os
+
+import numpy as np
+
+
+def map_records(path: Path, mode: str = "r") -> List[np.ndarray]:
+    """
+    Memory-maps every .npy record written one after the other into path, in order.
+    """
+    arrays = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        while f.tell() < size:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+            nbytes = int(np.prod(shape)) * dtype.itemsize
+            if nbytes == 0:
+                arrays.append(np.empty(shape, dtype=dtype))
+            else:
+                arrays.append(np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=shape))
+            f.seek(offset + nbytes)
+    return arrays
+
+
+class CompiledMDP(Mapping):
+    """
+    Flat CSR representation of a transition model P[s][a] = [(prob, s', r, done)].
+
+    Entries of the pair (s, a) live in the slice
+    offsets[s * actions_n + a]:offsets[s * actions_n + a + 1] of the
+    probabilities, next_states, rewards and terminals arrays.
+    """
+
+    FIELDS = ("offsets", "probabilities", "next_states", "rewards", "terminals")
+
+    # layout written by save(), bump it when that changes so older files are never read
+    FORMAT_VERSION = 1
+
+    def __init__(
+        self,
+        states_n: int,
+        actions_n: int,
+        offsets: np.ndarray,
+        probabilities: np.ndarray,
+        next_states: np.ndarray,
+        rewards: np.ndarray,
+        terminals: np.ndarray,
+    ) -> None:
+        self.states_n = states_n
+        self.actions_n = actions_n
+        self.offsets = offsets
+        self.probabilities = probabilities
+        self.next_states = next_states
+        self.rewards = rewards
+        self.terminals = terminals
+
+    @cached_property
+    def pairs(self) -> np.ndarray:
+        # (s, a) pair owning every entry, used to reduce entries into Q values
+        return np.repeat(
+            np.arange(self.states_n * self.actions_n, dtype=np.int64),
+            np.diff(self.offsets),
+        )
+
+    @cached_property
+    def expected_rewards(self) -> np.ndarray:
+        # expected immediate reward of every (s, a) pair
+        return np.bincount(
+            self.pairs,
+            weights=self.probabilities * self.rewards,
+            minlength=self.states_n * self.actions_n,
+        ).reshape(self.states_n, self.actions_n)
+
+    @classmethod
+    def from_P(cls, P, states_n: int, actions_n: int) -> "CompiledMDP":
+        if isinstance(P, CompiledMDP):
+            return P
+
+        counts = np.zeros(states_n * actions_n + 1, dtype=np.int64)
+        transitions: List[Tuple[float, int, float, bool]] = []
+        for s in range(states_n):
+            for a in range(actions_n):
+                possibilities = P[s][a]
+                counts[s * actions_n + a + 1] = len(possibilities)
+                transitions.extend(possibilities)
+
+        probabilities, next_states, rewards, terminals = (
+            zip(*transitions) if transitions else ((), (), (), ())
+        )
+        return cls(
+            states_n,
+            actions_n,
+            np.cumsum(counts),
+            np.array(probabilities, dtype=np.float64),
+            np.array(next_states, dtype=np.int64),
+            np.array(rewards, dtype=np.float64),
+            np.array(terminals, dtype=bool),
+        )
+
+    def save(self, path: Path) -> None:
+        """
+        Writes the model as consecutive .npy records so it can be memory-mapped back.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write aside and rename, so concurrent readers never see a partial file
+        tmp = path.with_name("{}.{}.tmp".format(path.name, os.getpid()))
+        with open(tmp, "wb") as f:
+            np.lib.format.write_array(
+                f, np.array([self.states_n, self.actions_n], dtype=np.int64)
+            )
+            for name in self.FIELDS:
+                np.lib.format.write_array(f, np.ascontiguousarray(getattr(self, name)))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledMDP":
+        """
+        Maps a model written by save() without reading it into memory.
+        """
+        arrays = map_records(path)
+        states_n, actions_n = (int(n) for n in arrays[0])
+        return cls(states_n, actions_n, *arrays[1:])
+
+    @classmethod
+    def cache_key(cls, *parts) -> str:
+        """
+        Digest naming a stored model, salted with the file format version.
+
+        parts describe what the model is built from, the builder version among them.
+        """
+        key = hashlib.sha1(str(cls.FORMAT_VERSION).encode())
+        for part in parts:
+            key.update(b"\0")
+            key.update(part if isinstance(part, bytes) else repr(part).encode())
+        return key.hexdigest()
+
+    @classmethod
+    def cached(cls, path: Path, build: Callable[[], "CompiledMDP"]) -> "CompiledMDP":
+        """
+        Loads the model stored at path, building and storing it on a miss.
+        """
+        path = Path(path)
+        if path.exists():
+            return cls.load(path)
+        mdp = build()
+        mdp.save(path)
+        return mdp
+
+    def q_values(self, values: np.ndarray, gamma: float) -> np.ndarray:
+        """
+        One Bellman backup: Q[s, a] = sum(prob * (r + gamma * V[s'])).
+        """
+        future = np.bincount(
+            self.pairs,
+            weights=self.probabilities * values[self.next_states],
+            minlength=self.states_n * self.actions_n,
+        ).reshape(self.states_n, self.actions_n)
+        return self.expected_rewards + gamma * future
+
+    def restrict(self, policy: np.ndarray) -> "CompiledMDP":
+        """
+        Single action model holding only the entries of the actions chosen by policy.
+        """
+        pairs = np.arange(self.states_n, dtype=np.int64) * self.actions_n + policy.astype(np.int64)
+        begin, end = self.offsets[pairs], self.offsets[pairs + 1]
+        counts = end - begin
+        offsets = np.zeros(self.states_n + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        entries = np.arange(offsets[-1], dtype=np.int64) + np.repeat(begin - offsets[:-1], counts)
+        return CompiledMDP(
+            self.states_n,
+            1,
+            offsets,
+            self.probabilities[entries],
+            self.next_states[entries],
+            self.rewards[entries],
+            self.terminals[entries],
+        )
+
+    def compact(self, start: int) -> Tuple["CompiledMDP", np.ndarray, np.ndarray]:
+        """
+        Model over the states reachable from start, renumbered densely.
+
+        Returns the compact model, the decode table (compact -> original state)
+        and the encode table (original -> compact state, -1 when unreachable).
+        """
+        visited = np.zeros(self.states_n, dtype=bool)
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        while len(frontier) > 0:
+            successors = self.next_states[self.__entries(frontier)]
+            frontier = np.unique(successors[~visited[successors]])
+            visited[frontier] = True
+
+        decode = np.flatnonzero(visited)
+        encode = np.full(self.states_n, -1, dtype=np.int64)
+        encode[decode] = np.arange(len(decode), dtype=np.int64)
+
+        pairs = (decode[:, None] * self.actions_n + np.arange(self.actions_n)).ravel()
+        offsets = np.zeros(len(pairs) + 1, dtype=np.int64)
+        np.cumsum(self.offsets[pairs + 1] - self.offsets[pairs], out=offsets[1:])
+        entries = self.__entries(decode)
+        model = CompiledMDP(
+            len(decode),
+            self.actions_n,
+            offsets,
+            self.probabilities[entries],
+            encode[self.next_states[entries]],
+            self.rewards[entries],
+            self.terminals[entries],
+        )
+        return model, decode, encode
+
+    def __entries(self, states: np.ndarray) -> np.ndarray:
+        # indices of all the entries of the given states, in state order
+        begin = self.offsets[states * self.actions_n]
+        counts = self.offsets[(states + 1) * self.actions_n] - begin
+        starts = np.zeros(len(states), dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        return np.arange(counts.sum(), dtype=np.int64) + np.repeat(begin - starts, counts)
+
+    def transitions(self, state: int, action: int) -> List[Tuple[float, int, float, bool]]:
+        # [(prob, s', r, done)] list of a single pair
+        begin = self.offsets[state * self.actions_n + action]
+        end = self.offsets[state * self.actions_n + action + 1]
+        return [
+            (
+                float(self.probabilities[i]),
+                int(self.next_states[i]),
+                float(self.rewards[i]),
+                bool(self.terminals[i]),
+            )
+            for i in range(begin, end)
+        ]
+
+    @cached_property
+    def outcomes(self) -> List[Tuple[int, float, bool]]:
+        """
+        (s', r, done) of every pair as plain Python values, indexed by s * actions_n + a.
+
+        Only meant for deterministic models, the first entry of every pair is kept.
+        A step is then one list lookup instead of a walk through NumPy scalars.
+        """
+        entries = self.offsets[:-1]
+        return list(zip(
+            self.next_states[entries].tolist(),
+            self.rewards[entries].tolist(),
+            self.terminals[entries].tolist(),
+        ))
+
+    def __getitem__(self, state: int) -> "CompiledRow":
+        # Same P[s][a] interface the environments expose
+        if not 0 <= state < self.states_n:
+            raise KeyError(state)
+        return CompiledRow(self, state)
+
+    def __iter__(self):
+        return iter(range(self.states_n))
+
+    def __len__(self) -> int:
+        return self.states_n
+
+
+class CompiledRow(Mapping):
+    # P[s] of a CompiledMDP, only the requested action is turned into tuples
+    def __init__(self, P: CompiledMDP, state: int) -> None:
+        self.P = P
+        self.state = state
+
+    def __getitem__(self, action: int) -> List[Tuple[float, int, float, bool]]:
+        if not 0 <= action < self.P.actions_n:
+            raise KeyError(action)
+        return self.P.transitions(self.state, action)
+
+    def __iter__(self):
+        return iter(range(self.P.actions_n))
+
+    def __len__(self) -> int:
+        return self.P.actions_n
+
+
+class LazyP(Mapping):
+    """
+    P[s][a] mapping computed on first access and kept in a bounded LRU cache.
+
+    compute(state, action) returns the [(prob, s', r, done)] list of the pair,
+    transitions(state, action) looks it up like CompiledMDP.transitions.
+    """
+
+    def __init__(
+        self,
+        states_n: int,
+        actions_n: int,
+        compute: Callable[[int, int], List[Tuple[float, int, float, bool]]],
+        maxsize: int = 2**16,
+    ) -> None:
+        self.states_n = states_n
+        self.actions_n = actions_n
+        self.compute = compute
+        self.maxsize = maxsize
+        self.cache: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def transitions(self, state: int, action: int) -> List[Tuple[float, int, float, bool]]:
+        key = (state, action)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        self.misses += 1
+        possibilities = self.compute(state, action)
+        self.cache[key] = possibilities
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return possibilities
+
+    def __getitem__(self, state: int) -> "LazyRow":
+        if not 0 <= state < self.states_n:
+            raise KeyError(state)
+        return LazyRow(self, state)
+
+    def __iter__(self):
+        return iter(range(self.states_n))
+
+    def __len__(self) -> int:
+        return self.states_n
+
+
+class LazyRow(Mapping):
+    def __init__(self, P: LazyP, state: int) -> None:
+        self.P = P
+        self.state = state
+
+    def __getitem__(self, action: int) -> List[Tuple[float, int, float, bool]]:
+        if not 0 <= action < self.P.actions_n:
+            raise KeyError(action)
+        return self.P.transitions(self.state, action)
+
+    def __iter__(self):
+        return iter(range(self.P.actions_n))
+
+    def __len__(self) -> int:
+        return self.P.actions_n
@@ -0,0 +1,106 @@
+"""
+FarmEnv transition model against a step by step simulation of the puzzle
+"""
+import numpy as np
+
+from farm import FarmEnv
+
+
+def simulate_step(env, state, action):
+    # Scene.apply_action on plain (d, mc, b1, b2) cell indices
+    scene = env.game.scene
+    rows, cols = env.rows, env.cols
+    d, mc, b1, b2 = state
+    i, j = mc // cols, mc % cols
+    if action < 4:
+        d = action
+        di, dj = scene.push_directions[action]
+        n_i, n_j = i + di, j + dj
+        if 0 <= n_i < rows and 0 <= n_j < cols and n_i * cols + n_j not in (b1, b2):
+            mc = n_i * cols + n_j
+    else:
+        di, dj = scene.push_directions[d]
+        n_i, n_j = i + di, j + dj
+        if 0 <= n_i < rows and 0 <= n_j < cols:
+            if n_i * cols + n_j == b1:
+                b1 = slide(env, b1, di, dj, b2)
+            elif n_i * cols + n_j == b2:
+                b2 = slide(env, b2, di, dj, b1)
+
+    to_state = (d, mc, b1, b2)
+    target = scene.target[0] * cols + scene.target[1]
+    terminated = target in (b1, b2)
+    if to_state == state:
+        reward = -10.0
+    elif terminated:
+        reward = 0.0
+    else:
+        reward = -1.0
+    return to_state, reward, terminated
+
+
+def slide(env, box, di, dj, other):
+    # Box.push: the box slides over ice until a non ice tile or the other box
+    tile_map = env.game.scene.tile_map
+    i, j = box // env.cols, box % env.cols
+    while (
+        0 <= i + di < env.rows
+        and 0 <= j + dj < env.cols
+        and (i + di) * env.cols + j + dj != other
+        and tile_map.map[i + di][j + dj] == "I"
+    ):
+        i += di
+        j += dj
+    return i * env.cols + j
+
+
+def encode(env, d, mc, b1, b2):
+    return int(
+        ((d * env.mc_n + mc) * env.b1_n + env.ice_index[b1]) * env.b2_n + env.ice_index[b2]
+    )
+
+
+def test_compiled_model_matches_simulation():
+    env = FarmEnv()
+    target = env.game.scene.target[0] * env.cols + env.game.scene.target[1]
+    actions_n = env.action_space.n
+    next_states = np.empty(env.observation_space.n * actions_n, dtype=np.int64)
+    rewards = np.empty(env.observation_space.n * actions_n, dtype=np.float64)
+    terminals = np.empty(env.observation_space.n * actions_n, dtype=bool)
+
+    pair = 0
+    for d in range(env.num_directions):
+        for mc in range(env.mc_n):
+            for b1 in env.ice:
+                for b2 in env.ice:
+                    state = (d, mc, b1, b2)
+                    for action in range(actions_n):
+                        if target in (b1, b2):
+                            # a box already on the target, the state is absorbing
+                            to_state, reward, terminated = state, 0.0, True
+                        else:
+                            to_state, reward, terminated = simulate_step(env, state, action)
+                        next_states[pair] = encode(env, *to_state)
+                        rewards[pair] = reward
+                        terminals[pair] = terminated
+                        pair += 1
+
+    assert np.array_equal(env.P.offsets, np.arange(pair + 1))
+    assert np.array_equal(env.P.probabilities, np.ones(pair))
+    assert np.array_equal(env.P.next_states, next_states)
+    assert np.array_equal(env.P.rewards, rewards)
+    assert np.array_equal(env.P.terminals, terminals)
+
+
+def test_model_follows_the_game():
+    # the compiled model and the scene the env steps agree along random episodes
+    env = FarmEnv()
+    np_random = np.random.default_rng(0)
+    observation, _ = env.reset()
+    for _ in range(2000):
+        action = int(np_random.integers(env.action_space.n))
+        expected = env.P.outcomes[observation * env.action_space.n + action]
+        observation, reward, terminated, _, _ = env.step(action)
+        assert (observation, reward, terminated) == expected
+        if terminated:
+            observation, _ = env.reset()
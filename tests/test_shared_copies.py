@@ -0,0 +1,45 @@
+"""
+Modules every lecture directory keeps its own copy of, so each one runs on its own.
+
+The copies are edited together, these tests fail as soon as one drifts.
+"""
+import pathlib
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+COPIES = {
+    "mdp.py": [
+        "agents/lecture2/mdp.py",
+        "environments/lecture2/mdp.py",
+        "environments/lecture3/mdp.py",
+        "environments/lecture4/mdp.py",
+        "project-v0/mdp.py",
+    ],
+    "lazy_assets.py": [
+        "environments/lecture2/lazy_assets.py",
+        "environments/lecture3/lazy_assets.py",
+        "environments/lecture4/game/src/lazy_assets.py",
+        "project-v0/game/src/lazy_assets.py",
+    ],
+}
+
+
+@pytest.mark.parametrize("name", sorted(COPIES))
+def test_copies_are_identical(name):
+    reference, *others = COPIES[name]
+    expected = (ROOT / reference).read_bytes()
+    drifted = [path for path in others if (ROOT / path).read_bytes() != expected]
+    assert not drifted, "{} differ from {}".format(", ".join(drifted), reference)
+
+
+@pytest.mark.parametrize("name", sorted(COPIES))
+def test_every_copy_is_listed(name):
+    # a new lecture directory with its own copy must be added above
+    found = {
+        path.relative_to(ROOT).as_posix()
+        for path in ROOT.glob("**/" + name)
+        if not any(part.startswith(".") for part in path.relative_to(ROOT).parts)
+    }
+    assert found == set(COPIES[name])